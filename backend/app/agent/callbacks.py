@@ -0,0 +1,98 @@
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from app.services.llm_accounting import LEDGER, LLM_CALLS, LLM_TOKENS, LLM_CALL_SECONDS
+
+
+def _token_usage(response) -> tuple:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0
+    usage = (response.llm_output or {}).get("usage_metadata") or {}
+    return usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0
+
+
+class LLMAccountingHandler(BaseCallbackHandler):
+    """
+    Collects per-call latency and token usage for a single analysis.
+    Pass it via `config={"callbacks": [handler]}`; LangGraph tags each call with its node name.
+    Calls are buffered and flushed to the LEDGER by `finish()`, once the ticker is known.
+    """
+
+    def __init__(self, user_id: Any, ticker: Optional[str] = None):
+        self.user_id = user_id
+        self.ticker = ticker
+        self.calls: List[Dict[str, Any]] = []
+        self.tool_calls = 0
+        self._pending: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._started_at = datetime.utcnow()
+        self._finished = False
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]]):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node") or metadata.get("node") or "unknown"
+        with self._lock:
+            self._pending[run_id] = (node, time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata)
+
+    def _end(self, run_id: UUID, input_tokens: int = 0, output_tokens: int = 0, error: Optional[str] = None):
+        with self._lock:
+            node, started = self._pending.pop(run_id, ("unknown", time.perf_counter()))
+            seconds = time.perf_counter() - started
+            self.calls.append({
+                "node": node,
+                "seconds": seconds,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "error": error,
+            })
+        LLM_CALLS.inc(node=node, outcome="error" if error else "ok")
+        LLM_CALL_SECONDS.observe(seconds, node=node)
+        LLM_TOKENS.inc(input_tokens, node=node, direction="input")
+        LLM_TOKENS.inc(output_tokens, node=node, direction="output")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        input_tokens, output_tokens = _token_usage(response)
+        self._end(run_id, input_tokens, output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=type(error).__name__)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        with self._lock:
+            self.tool_calls += 1
+
+    def finish(self, outcome: str = "ok") -> Optional[Dict[str, Any]]:
+        """Flushes this analysis into the LEDGER. Safe to call more than once."""
+        if self._finished or not self.calls:
+            return None
+        self._finished = True
+        run = {
+            "user_id": self.user_id,
+            "ticker": self.ticker or "UNRESOLVED",
+            "outcome": outcome,
+            "started_at": self._started_at.isoformat(),
+            "llm_calls": len(self.calls),
+            "iterations": sum(1 for call in self.calls if call["node"] == "agent"),
+            "tool_calls": self.tool_calls,
+            "errors": sum(1 for call in self.calls if call["error"]),
+            "input_tokens": sum(call["input_tokens"] for call in self.calls),
+            "output_tokens": sum(call["output_tokens"] for call in self.calls),
+            "llm_seconds": round(sum(call["seconds"] for call in self.calls), 3),
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "calls": list(self.calls),
+        }
+        LEDGER.record_run(run)
+        return run
@@ -0,0 +1,159 @@
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Optional
+
+# Durable LangGraph checkpoints, so a failed analysis resumes from its last completed node.
+# AGENT_CHECKPOINT_URL picks the backend (defaults to DATABASE_URL):
+#   postgresql://...  -> AsyncPostgresSaver   (langgraph-checkpoint-postgres)
+#   anything else     -> AsyncSqliteSaver on AGENT_CHECKPOINT_PATH (langgraph-checkpoint-sqlite)
+# The saver is opened by the first analysis, so API startup never imports it. Without those
+# packages, or while the store cannot be opened, checkpoints stay in memory.
+
+CHECKPOINT_PATH = os.getenv("AGENT_CHECKPOINT_PATH", "agent_checkpoints.db")
+# Older unfinished runs are discarded instead of resumed (market data and news have moved on)
+RESUME_MAX_AGE_SECONDS = int(os.getenv("AGENT_RESUME_MAX_AGE_SECONDS", "3600"))
+
+# After a failed open the in-memory saver is used, and the durable one retried this much later
+CHECKPOINT_RETRY_SECONDS = 60
+
+_saver = None
+_stack: Optional[AsyncExitStack] = None
+_open_lock = asyncio.Lock()
+# Set when the saver package is missing: retrying cannot help
+_unavailable = False
+_last_failure = 0.0
+_compiled = {}
+# Threads with a run in flight in this process
+_active_threads = set()
+
+async def open_checkpointer():
+    """Opens the configured saver for the lifetime of the API process."""
+    global _saver, _stack, _unavailable, _last_failure
+    url = os.getenv("AGENT_CHECKPOINT_URL") or os.getenv("DATABASE_URL", "")
+    stack = AsyncExitStack()
+    try:
+        if url.startswith("postgres"):
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+            # psycopg 3 takes plain libpq URLs, without SQLAlchemy's driver suffix
+            conn_string = url.replace("postgresql+psycopg2://", "postgresql://").replace("postgres://", "postgresql://", 1)
+            saver = await stack.enter_async_context(AsyncPostgresSaver.from_conn_string(conn_string))
+            await saver.setup()
+        else:
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            saver = await stack.enter_async_context(AsyncSqliteSaver.from_conn_string(CHECKPOINT_PATH))
+            # The connection opens lazily; fail here on an unwritable path, not mid-run
+            await saver.setup()
+    except ImportError as e:
+        _unavailable = True
+        print(f"⚠️ Durable agent checkpoints unavailable ({e}); using in-memory checkpoints")
+        return
+    except Exception as e:
+        await stack.aclose()
+        _last_failure = time.monotonic()
+        print(f"⚠️ Could not open agent checkpoints ({e}); using in-memory checkpoints, retrying in {CHECKPOINT_RETRY_SECONDS}s")
+        return
+    _stack, _saver = stack, saver
+    _last_failure = 0.0
+    _compiled.clear()
+    print(f"✅ Agent checkpoints: {type(saver).__name__}")
+
+async def ensure_checkpointer():
+    """Opens the saver on first use, and again after a failed open once the retry interval has passed."""
+    if _stack is not None or _unavailable:
+        return
+    async with _open_lock:
+        if _stack is not None or _unavailable:
+            return
+        if _last_failure and time.monotonic() - _last_failure < CHECKPOINT_RETRY_SECONDS:
+            return
+        await open_checkpointer()
+
+async def close_checkpointer():
+    global _saver, _stack
+    if _stack is not None:
+        await _stack.aclose()
+    _stack = None
+    _saver = None
+    _compiled.clear()
+
+def get_checkpointer():
+    global _saver
+    if _saver is None:
+        from langgraph.checkpoint.memory import InMemorySaver
+        _saver = InMemorySaver()
+    return _saver
+
+def get_checkpointed_agent():
+    """The analyst graph compiled against the current checkpointer."""
+    checkpointer = get_checkpointer()
+    key = id(checkpointer)
+    if key not in _compiled:
+        from app.agent.graph import workflow
+        _compiled.clear()
+        _compiled[key] = workflow.compile(checkpointer=checkpointer)
+    return _compiled[key]
+
+def analysis_thread_id(user_id: int, ticker: str, currency: str) -> str:
+    """One checkpoint thread per (user, ticker, currency): a retry of the same analysis finds it."""
+    digest = hashlib.sha256(f"{user_id}:{ticker}:{currency}".encode("utf-8")).hexdigest()[:24]
+    return f"analysis-{digest}"
+
+def claim_thread(thread_id: str) -> str:
+    """
+    The thread this attempt runs on. A concurrent analysis of the same (user, ticker, currency)
+    gets a throwaway thread of its own instead of writing into the one already in flight.
+    """
+    if thread_id in _active_threads:
+        thread_id = f"{thread_id}-{uuid.uuid4().hex[:8]}"
+    _active_threads.add(thread_id)
+    return thread_id
+
+async def release_thread(base_id: str, thread_id: Optional[str], secret: Optional[str] = None):
+    if thread_id is None:
+        return
+    _active_threads.discard(thread_id)
+    # A throwaway thread is never looked up again, so its checkpoints are dropped either way
+    if thread_id != base_id:
+        await discard_thread(thread_id)
+    elif secret and await _leaks_secret(thread_id, secret):
+        print(f"🛑 Checkpoint metadata on {thread_id} contains the user's API key; discarding the thread")
+        await discard_thread(thread_id)
+
+async def _leaks_secret(thread_id: str, secret: str) -> bool:
+    """True if any checkpoint kept for a retry has the secret in its metadata."""
+    async for saved in get_checkpointer().alist({"configurable": {"thread_id": thread_id}}):
+        if secret in repr(saved.metadata):
+            return True
+    return False
+
+async def resumable_state(agent, config: dict):
+    """
+    The unfinished checkpoint for this thread, or None if there is nothing worth resuming.
+    A finished run, or one older than RESUME_MAX_AGE_SECONDS, is deleted so the fresh run
+    starts on an empty thread instead of appending to the old conversation.
+    """
+    snapshot = await agent.aget_state(config)
+    if not snapshot or not snapshot.values:
+        return None
+    if not snapshot.next:
+        await discard_thread(config["configurable"]["thread_id"])
+        return None
+    if snapshot.created_at:
+        created = datetime.fromisoformat(snapshot.created_at)
+        if created.tzinfo is None:
+            created = created.replace(tzinfo=timezone.utc)
+        if (datetime.now(timezone.utc) - created).total_seconds() > RESUME_MAX_AGE_SECONDS:
+            await discard_thread(config["configurable"]["thread_id"])
+            return None
+    return snapshot
+
+async def discard_thread(thread_id: str):
+    try:
+        await get_checkpointer().adelete_thread(thread_id)
+    except Exception as e:
+        print(f"⚠️ Could not delete checkpoint thread {thread_id}: {e}")
@@ -0,0 +1,111 @@
+import os
+import json
+from typing import List, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from app.services.key_scheduler import CHARS_PER_TOKEN
+from app.services.metrics import Counter
+
+# Conversation compaction between agent turns. A tool output the model has already answered
+# (an AI message follows it) is replaced in state, by message id, with a compact summary;
+# if the prompt is still over AGENT_MAX_PROMPT_TOKENS, the remaining tool outputs are cut
+# oldest-first. Messages are shrunk, never removed, so every tool call keeps its response.
+
+# Tool outputs shorter than this are left as they are
+COMPACT_MIN_CHARS = 600
+COMPACT_MAX_CHARS = 400
+AGENT_MAX_PROMPT_TOKENS = int(os.getenv("AGENT_MAX_PROMPT_TOKENS", "12000"))
+# Floor for tool outputs cut to fit AGENT_MAX_PROMPT_TOKENS
+TRUNCATED_MIN_CHARS = 200
+
+COMPACTION_TOKENS_SAVED = Counter(
+    "signalforge_agent_compaction_tokens_saved_total",
+    "Estimated prompt tokens removed by compacting tool outputs, by reason (seen, prompt_limit).",
+    ("reason",),
+)
+
+def _tokens(chars: int) -> int:
+    return chars // CHARS_PER_TOKEN
+
+def _summarize_json(data, max_chars: int) -> str:
+    """Scalars from the top two levels of a JSON tool result; lists are reduced to their length."""
+    def scalars(obj: dict) -> dict:
+        out = {}
+        for key, value in obj.items():
+            if isinstance(value, dict):
+                nested = {k: v for k, v in value.items() if isinstance(v, (str, int, float, bool)) or v is None}
+                if nested:
+                    out[key] = nested
+            elif isinstance(value, list):
+                out[key] = f"[{len(value)} items]"
+            else:
+                out[key] = value
+        return out
+
+    summary = json.dumps(scalars(data) if isinstance(data, dict) else data, ensure_ascii=False, default=str)
+    return summary[:max_chars]
+
+def _summarize_news(text: str, max_chars: int) -> str:
+    """Headlines of a news digest, each with the first sentence of its snippet."""
+    lines, headline = [], None
+    for line in text.splitlines():
+        if line.startswith("- "):
+            headline = line[2:].split(" (", 1)[0]
+        elif headline and line.strip():
+            first_sentence = line.strip().split(". ", 1)[0].rstrip(".")
+            lines.append(f"- {headline}: {first_sentence}.")
+            headline = None
+    return "\n".join(lines)[:max_chars] if lines else text[:max_chars]
+
+def summarize_tool_output(message: ToolMessage, max_chars: int = COMPACT_MAX_CHARS) -> str:
+    content = message.content
+    try:
+        body = _summarize_json(json.loads(content), max_chars)
+    except (TypeError, ValueError):
+        body = _summarize_news(content, max_chars) if message.name == "search_market_news" else content[:max_chars]
+    return f"[compacted {message.name or 'tool'} output, {len(content)} chars] {body}"
+
+def _replace(message: ToolMessage, content: str) -> ToolMessage:
+    # Same id, so the add_messages reducer swaps it in place
+    return message.model_copy(update={"content": content})
+
+def compact_messages(messages: List[BaseMessage], fixed_chars: int = 0) -> Tuple[List[BaseMessage], List[ToolMessage], int]:
+    """
+    Returns (prompt messages, replacements to write back to state, estimated tokens saved).
+    `fixed_chars` is the size of anything sent alongside (the system prompt).
+    """
+    messages = list(messages)
+    replacements = {}
+    saved = 0
+
+    # 1. Tool outputs followed by a model turn have been read: keep only a summary
+    last_ai = max((i for i, m in enumerate(messages) if isinstance(m, AIMessage)), default=-1)
+    for i, message in enumerate(messages[:last_ai]):
+        if (
+            isinstance(message, ToolMessage) and message.id and isinstance(message.content, str)
+            and len(message.content) >= COMPACT_MIN_CHARS and not message.content.startswith("[compacted")
+        ):
+            compacted = _replace(message, summarize_tool_output(message))
+            saved_now = _tokens(len(message.content) - len(compacted.content))
+            COMPACTION_TOKENS_SAVED.inc(saved_now, reason="seen")
+            saved += saved_now
+            messages[i] = replacements[message.id] = compacted
+
+    # 2. Still over the limit: cut the remaining tool outputs, oldest first
+    size = fixed_chars + sum(len(str(m.content)) for m in messages)
+    limit = AGENT_MAX_PROMPT_TOKENS * CHARS_PER_TOKEN
+    for i, message in enumerate(messages):
+        if size <= limit:
+            break
+        if not isinstance(message, ToolMessage) or not message.id or not isinstance(message.content, str):
+            continue
+        keep = max(TRUNCATED_MIN_CHARS, len(message.content) - (size - limit))
+        if keep >= len(message.content):
+            continue
+        cut = _replace(message, message.content[:keep] + f"\n[truncated {len(message.content) - keep} chars to fit the prompt limit]")
+        saved_now = _tokens(len(message.content) - len(cut.content))
+        COMPACTION_TOKENS_SAVED.inc(saved_now, reason="prompt_limit")
+        saved += saved_now
+        size -= len(message.content) - len(cut.content)
+        messages[i] = replacements[message.id] = cut
+
+    return messages, list(replacements.values()), saved
@@ -1,11 +1,16 @@
-from typing import Literal
+from typing import Literal, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from app.agent.state import AgentState
 from app.agent.tools import tools
+from app.agent.report_parser import REPORT_SCHEMA
+from app.agent.compaction import compact_messages
+from app.services.key_scheduler import SCHEDULER, estimate_tokens
 import os
+import time
 
 # --- 1. CONFIGURATION ---
 SYSTEM_PROMPT = """You are a Senior Investment Analyst at a top-tier hedge fund. 
@@ -24,6 +29,7 @@ All financial values, prices, and market caps MUST be formatted and converted dy
 1.  **Executive Verdict:** (Bullish/Bearish/Neutral) + High conviction one-liner.
 2.  **The Catalyst:** What specifically is driving the price right now? (Earnings, Macro, Product).
 3.  **Financial Health:** Key metrics (P/E, Revenue Growth, Cash Flow) compared to peers.
+    Use the `technicals` returned by fetch_stock_data (trend vs. 200d SMA, RSI, drawdown, 52-week range) instead of estimating them.
 4.  **Key Risks:** What could go wrong? (Geopolitics, Supply Chain, Valuation).
 5.  **Forward Outlook:** A prediction for the next quarter.
 
@@ -34,45 +40,140 @@ All financial values, prices, and market caps MUST be formatted and converted dy
 * Format with clear Markdown headers (##), bolding (**), and bullet points.
 """
 
+AGENT_MODEL = os.getenv("AGENT_MODEL", "gemini-2.5-flash")
+
+# Gemini 2.5 rejects a JSON response mime type alongside function declarations,
+# so structured output is only requested on tool turns for model families that allow it.
+STRUCTURED_TOOL_MODELS = ("gemini-3",)
+
+def build_agent_model(api_key: str, with_tools: bool = True):
+    """Builds the analyst model, in structured JSON mode wherever the model supports it."""
+    structured = not with_tools or AGENT_MODEL.startswith(STRUCTURED_TOOL_MODELS)
+    kwargs = {"response_mime_type": "application/json", "response_schema": REPORT_SCHEMA} if structured else {}
+    # Retries of 429s are left to the per-key scheduler, which also paces the calls
+    model = ChatGoogleGenerativeAI(model=AGENT_MODEL, temperature=0.2, api_key=api_key, max_retries=1, **kwargs)
+    return model.bind_tools(tools) if with_tools else model
+
+# Budget for one analysis. Once fewer than FINALIZE_RESERVE_SECONDS remain (or the step cap is hit)
+# the agent gets no more tool turns and must write the memo from what it has gathered.
+AGENT_TIME_BUDGET_SECONDS = float(os.getenv("AGENT_TIME_BUDGET_SECONDS", "90"))
+AGENT_MAX_STEPS = int(os.getenv("AGENT_MAX_STEPS", "6"))
+FINALIZE_RESERVE_SECONDS = float(os.getenv("AGENT_FINALIZE_RESERVE_SECONDS", "20"))
+
+FINALIZE_INSTRUCTION = (
+    "The research budget for this analysis is used up. Do not request any more tools. "
+    "Write the final Investment Memorandum now from the data gathered so far, "
+    "noting briefly where data is missing."
+)
+
+def initial_budget(time_budget: Optional[float] = None, max_steps: Optional[int] = None) -> dict:
+    started_at = time.time()
+    return {
+        "started_at": started_at,
+        "deadline": started_at + (time_budget or AGENT_TIME_BUDGET_SECONDS),
+        "max_steps": max_steps or AGENT_MAX_STEPS,
+        "steps": 0,
+    }
+
+def budget_report(state: AgentState) -> dict:
+    """Budget usage for the API response."""
+    started_at = state.get("started_at") or time.time()
+    return {
+        "steps": state.get("steps", 0),
+        "max_steps": state.get("max_steps", AGENT_MAX_STEPS),
+        "elapsed_seconds": round(time.time() - started_at, 2),
+        "time_budget_seconds": round(state.get("deadline", started_at + AGENT_TIME_BUDGET_SECONDS) - started_at, 2),
+        "exhausted": state.get("budget_exhausted"),
+        "tokens_saved": state.get("tokens_saved", 0),
+    }
+
+def _exhausted_reason(state: AgentState):
+    if state.get("steps", 0) >= state.get("max_steps", AGENT_MAX_STEPS):
+        return "steps"
+    deadline = state.get("deadline")
+    if deadline and time.time() + FINALIZE_RESERVE_SECONDS >= deadline:
+        return "time"
+    return None
+
+def _prompt(state: AgentState):
+    """
+    Compacted conversation with the system prompt in front, plus the state update that
+    writes the compacted tool outputs back (so later turns and checkpoints stay small).
+    """
+    system = SystemMessage(content=SYSTEM_PROMPT.format(global_currency=state.get("global_currency", "USD")))
+    messages, replacements, saved = compact_messages(state["messages"], fixed_chars=len(system.content))
+    if not isinstance(messages[0], SystemMessage):
+        messages = [system] + messages
+
+    update = {"messages": replacements}
+    if saved:
+        print(f"🗜️ Compacted {len(replacements)} tool outputs, ~{saved} prompt tokens saved")
+        update["tokens_saved"] = state.get("tokens_saved", 0) + saved
+    return messages, update
+
 # --- 2. NODES ---
 
-def agent_node(state: AgentState):
+# LangGraph copies primitive `configurable` values into every checkpoint's metadata (and
+# LangChain into run metadata) unless the key starts with "__", so the user's key goes under this one
+API_KEY_CONFIG_KEY = "__api_key"
+
+def _api_key(config: RunnableConfig) -> str:
+    return (config or {}).get("configurable", {}).get(API_KEY_CONFIG_KEY) or os.getenv("GOOGLE_API_KEY")
+
+def agent_node(state: AgentState, config: RunnableConfig):
     """
     The Brain: Decides whether to call a tool or answer the user.
     """
-    messages = state["messages"]
-    api_key = state.get("api_key") or os.getenv("GOOGLE_API_KEY")
+    api_key = _api_key(config)
     
     # Instantiate the model dynamically per request
-    dynamic_model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.2, api_key=api_key)
-    dynamic_model_with_tools = dynamic_model.bind_tools(tools)
-    
-    # Inject System Prompt if it's the first turn
-    if not isinstance(messages[0], SystemMessage):
-        global_currency = state.get("global_currency", "USD")
-        formatted_prompt = SYSTEM_PROMPT.format(global_currency=global_currency)
-        messages.insert(0, SystemMessage(content=formatted_prompt))
+    dynamic_model_with_tools = build_agent_model(api_key)
     
-    response = dynamic_model_with_tools.invoke(messages)
-    return {"messages": [response]}
+    prompt, update = _prompt(state)
+    response = SCHEDULER.call(api_key, lambda: dynamic_model_with_tools.invoke(prompt), estimate_tokens(prompt), caller="agent")
+    return {**update, "messages": update["messages"] + [response], "steps": state.get("steps", 0) + 1}
+
+def finalize_node(state: AgentState, config: RunnableConfig):
+    """
+    The Closer: Budget is spent, so the memo is written with tools unbound.
+    """
+    api_key = _api_key(config)
+    messages, update = _prompt(state)
+    # A tool request that will never run must not be sent back unanswered
+    if getattr(messages[-1], "tool_calls", None):
+        messages = messages[:-1]
+    messages.append(HumanMessage(content=FINALIZE_INSTRUCTION))
+
+    reason = _exhausted_reason(state) or "time"
+    print(f"⏱️ Agent budget exhausted ({reason}) after {state.get('steps', 0)} steps -> writing final memo")
+    model = build_agent_model(api_key, with_tools=False)
+    response = SCHEDULER.call(api_key, lambda: model.invoke(messages), estimate_tokens(messages), caller="finalize")
+    return {**update, "messages": update["messages"] + [response], "budget_exhausted": reason}
 
-def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
+def should_continue(state: AgentState) -> Literal["tools", "finalize", "__end__"]:
     """
-    The Traffic Cop: Checks if the last message was a tool call.
+    The Traffic Cop: Checks if the last message was a tool call, and whether the budget still allows it.
     """
     messages = state["messages"]
     last_message = messages[-1]
     
     if last_message.tool_calls:
+        if _exhausted_reason(state):
+            return "finalize"
         return "tools"
     
     return "__end__"
 
+def after_tools(state: AgentState) -> Literal["agent", "finalize"]:
+    """Tool results are in; skip straight to the memo if another tool turn no longer fits."""
+    return "finalize" if _exhausted_reason(state) else "agent"
+
 # --- 3. GRAPH BUILD ---
 workflow = StateGraph(AgentState)
 
 workflow.add_node("agent", agent_node)
 workflow.add_node("tools", ToolNode(tools))
+workflow.add_node("finalize", finalize_node)
 
 workflow.set_entry_point("agent")
 
@@ -80,6 +181,8 @@ workflow.add_conditional_edges(
     "agent",
     should_continue,
 )
-workflow.add_edge("tools", "agent")
+workflow.add_conditional_edges("tools", after_tools)
+workflow.add_edge("finalize", END)
 
-app = workflow.compile()
\ No newline at end of file
+# Checkpoint-free graph for scripts; the API compiles its own with a checkpointer (see checkpointing.py)
+app = workflow.compile()
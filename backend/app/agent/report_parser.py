@@ -0,0 +1,227 @@
+from typing import Optional, Tuple
+
+DEFAULT_SCORE = 50
+
+# JSON schema handed to Gemini when a structured (application/json) final answer is requested.
+REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer"},
+        "markdown": {"type": "string"},
+    },
+    "required": ["score", "markdown"],
+}
+
+_WANTED_KEYS = ("score", "markdown")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Parser states
+_PRELUDE, _OBJECT, _KEY, _AFTER_KEY, _VALUE, _STRING, _ESCAPE, _UNICODE = range(8)
+_CLOSE_PENDING, _COMMA_PENDING, _NEXT_KEY, _NEXT_KEY_CLOSED, _SCALAR, _NESTED, _DONE = range(8, 15)
+# Longest quoted text after `", ` still buffered as a possible key
+_MAX_KEY_LENGTH = 64
+
+
+class IncrementalReportParser:
+    """
+    Single-pass, tolerant extractor for the agent's {"score": int, "markdown": str} answer.
+
+    Feed it chunks as they stream in; `snapshot()` is available at any point.
+    Handles code fences and leading prose, raw newlines inside strings, and
+    unescaped quotes inside the markdown (a quote only closes a string when it is
+    followed by `}` or by `,` and another complete `"key":`).
+    """
+
+    def __init__(self):
+        self.score: Optional[int] = None
+        self.markdown: Optional[str] = None
+        self._raw = []
+        self._state = _PRELUDE
+        self._key = []
+        self._current_key = ""
+        self._value = []
+        self._pending = []
+        self._unicode = []
+        self._nested_depth = 0
+        self._nested_in_string = False
+        self._nested_escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: str):
+        self._raw.append(chunk)
+        for ch in chunk:
+            self._step(ch)
+
+    def snapshot(self) -> Tuple[Optional[int], Optional[str]]:
+        """Best-effort (score, markdown) from whatever has been fed so far."""
+        markdown = self.markdown
+        if markdown is None and self._current_key == "markdown" and self._state in (_STRING, _ESCAPE, _UNICODE, _CLOSE_PENDING, _COMMA_PENDING, _NEXT_KEY, _NEXT_KEY_CLOSED):
+            markdown = "".join(self._value)
+        return self.score, markdown
+
+    def finish(self) -> Tuple[int, str]:
+        """Final (score, markdown). Falls back to the raw text when no markdown field was found."""
+        score, markdown = self.snapshot()
+        if markdown is None:
+            markdown = "".join(self._raw).strip()
+        return (DEFAULT_SCORE if score is None else score), markdown
+
+    # --- State machine ---
+    def _step(self, ch: str):
+        state = self._state
+        if state == _STRING:
+            if ch == "\\":
+                self._state = _ESCAPE
+            elif ch == '"':
+                self._pending = [ch]
+                self._state = _CLOSE_PENDING
+            else:
+                self._value.append(ch)
+        elif state == _ESCAPE:
+            if ch == "u":
+                self._unicode = []
+                self._state = _UNICODE
+                return
+            self._value.append(_ESCAPES.get(ch, "\\" + ch))
+            self._state = _STRING
+        elif state == _UNICODE:
+            self._unicode.append(ch)
+            if len(self._unicode) == 4:
+                code = "".join(self._unicode)
+                try:
+                    self._value.append(chr(int(code, 16)))
+                except ValueError:
+                    self._value.append("\\u" + code)
+                self._state = _STRING
+        elif state == _CLOSE_PENDING:
+            if ch in " \t\r\n":
+                self._pending.append(ch)
+            elif ch == "}":
+                self._close_value()
+                self._state = _DONE
+            elif ch == ",":
+                self._pending.append(ch)
+                self._state = _COMMA_PENDING
+            else:
+                self._reopen(ch)
+        elif state == _COMMA_PENDING:
+            if ch in " \t\r\n":
+                self._pending.append(ch)
+            elif ch == '"':
+                # Only a key that is closed and followed by `:` ends the value (markdown like `"x", "y"` does not)
+                self._pending.append(ch)
+                self._key = []
+                self._state = _NEXT_KEY
+            elif ch == "}":
+                self._close_value()
+                self._state = _DONE
+            else:
+                self._reopen(ch)
+        elif state == _NEXT_KEY:
+            if ch == '"':
+                self._pending.append(ch)
+                self._state = _NEXT_KEY_CLOSED
+            elif ch in "\\\r\n" or len(self._key) >= _MAX_KEY_LENGTH:
+                self._reopen(ch)
+            else:
+                self._pending.append(ch)
+                self._key.append(ch)
+        elif state == _NEXT_KEY_CLOSED:
+            if ch in " \t\r\n":
+                self._pending.append(ch)
+            elif ch == ":":
+                self._close_value()
+                self._current_key = "".join(self._key)
+                self._state = _VALUE
+            else:
+                self._reopen(ch)
+        elif state == _PRELUDE:
+            if ch == "{":
+                self._state = _OBJECT
+        elif state == _OBJECT:
+            if ch == '"':
+                self._key = []
+                self._state = _KEY
+            elif ch == "}":
+                self._state = _DONE
+        elif state == _KEY:
+            if ch == '"':
+                self._current_key = "".join(self._key)
+                self._state = _AFTER_KEY
+            else:
+                self._key.append(ch)
+        elif state == _AFTER_KEY:
+            if ch == ":":
+                self._state = _VALUE
+        elif state == _VALUE:
+            if ch in " \t\r\n":
+                return
+            self._value = []
+            if ch == '"':
+                self._state = _STRING
+            elif ch in "{[":
+                self._nested_depth = 1
+                self._nested_in_string = False
+                self._nested_escape = False
+                self._state = _NESTED
+            else:
+                self._value.append(ch)
+                self._state = _SCALAR
+        elif state == _SCALAR:
+            if ch in ",}":
+                self._close_value()
+                self._state = _DONE if ch == "}" else _OBJECT
+            else:
+                self._value.append(ch)
+        elif state == _NESTED:
+            self._step_nested(ch)
+
+    def _step_nested(self, ch: str):
+        if self._nested_in_string:
+            if self._nested_escape:
+                self._nested_escape = False
+            elif ch == "\\":
+                self._nested_escape = True
+            elif ch == '"':
+                self._nested_in_string = False
+        elif ch == '"':
+            self._nested_in_string = True
+        elif ch in "{[":
+            self._nested_depth += 1
+        elif ch in "}]":
+            self._nested_depth -= 1
+            if self._nested_depth == 0:
+                self._state = _OBJECT
+
+    def _reopen(self, ch: str):
+        # The quote was part of the text, not a string terminator. What followed it is replayed,
+        # since a later quote in the buffer may be the real terminator.
+        pending, self._pending = self._pending, []
+        self._value.append(pending[0])
+        self._state = _STRING
+        for buffered in pending[1:]:
+            self._step(buffered)
+        self._step(ch)
+
+    def _close_value(self):
+        self._pending = []
+        if self._current_key not in _WANTED_KEYS:
+            return
+        text = "".join(self._value)
+        if self._current_key == "markdown":
+            self.markdown = text
+        else:
+            try:
+                self.score = max(0, min(100, int(round(float(text.strip())))))
+            except ValueError:
+                pass
+
+
+def parse_report(text: str) -> Tuple[int, str]:
+    """Parses a complete agent answer into (sentiment_score, markdown) in one pass."""
+    parser = IncrementalReportParser()
+    parser.feed(text)
+    return parser.finish()
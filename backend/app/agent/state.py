@@ -1,13 +1,21 @@
-import operator
 from typing import Annotated, List, TypedDict, Union
 from langchain_core.messages import BaseMessage
+from langgraph.graph.message import add_messages
 
 class AgentState(TypedDict, total=False):
-    messages: Annotated[List[BaseMessage], operator.add]
+    # add_messages appends, but replaces a message that has the same id (used by compaction)
+    messages: Annotated[List[BaseMessage], add_messages]
     company: str
     ticker: str
     stock_data: dict
     news_summary: str
     report: str
-    api_key: str
-    global_currency: str
\ No newline at end of file
+    global_currency: str
+    # Per-analysis budget (see graph.initial_budget): wall-clock deadline and agent-turn cap
+    started_at: float
+    deadline: float
+    max_steps: int
+    steps: int
+    budget_exhausted: str
+    # Estimated prompt tokens removed by compaction (see compaction.py)
+    tokens_saved: int
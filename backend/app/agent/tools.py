@@ -1,6 +1,5 @@
 import os
 import warnings
-import yfinance as yf
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 
@@ -10,95 +9,60 @@ load_dotenv()
 # 2. Suppress the specific LangChain deprecation warning
 warnings.filterwarnings("ignore", category=UserWarning, module="langchain")
 
-# 3. Use the community import
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_community.tools import DuckDuckGoSearchRun
+# 3. Seconds to wait on Tavily before racing DuckDuckGo against it
+NEWS_HEDGE_AFTER = float(os.getenv("NEWS_HEDGE_AFTER", "2.5"))
 
-# Initialize Search Tools
-tavily_tool = TavilySearchResults(max_results=3)
-ddg_tool = DuckDuckGoSearchRun()
+# 4. Search clients are created on first use (langchain_community is slow to import)
+_tavily_tool = None
+_ddg_tool = None
+
+def get_tavily_tool():
+    global _tavily_tool
+    if _tavily_tool is None:
+        from langchain_community.tools.tavily_search import TavilySearchResults
+        from app.services.news import NEWS_MAX_RESULTS
+        _tavily_tool = TavilySearchResults(max_results=NEWS_MAX_RESULTS)
+    return _tavily_tool
+
+def get_ddg_tool():
+    global _ddg_tool
+    if _ddg_tool is None:
+        from langchain_community.tools import DuckDuckGoSearchResults
+        from app.services.news import NEWS_MAX_RESULTS
+        # Structured news results (title, link, date) rather than one concatenated blob
+        _ddg_tool = DuckDuckGoSearchResults(output_format="list", backend="news", num_results=NEWS_MAX_RESULTS)
+    return _ddg_tool
 
 @tool
 def fetch_stock_data(ticker: str):
     """
-    Fetches historical stock data and current info from Alpaca.
-    Input should be a stock ticker symbol (e.g., AAPL, TSLA).
+    Fetches current price, recent growth and a technical summary (moving averages, RSI,
+    volatility, drawdown, 52-week range, multi-window returns) for a stock.
+    Input should be a stock ticker symbol (e.g., AAPL, TSLA, RELIANCE.NS).
     """
     try:
-        import requests
-        from datetime import datetime, timedelta
-        import os
-        
-        if "." in ticker:
-            import yfinance as yf
-            tick = yf.Ticker(ticker.upper())
-            hist = tick.history(period="1mo")
-            if hist.empty:
-                return {"error": "No stock data found via international feed."}
-                
-            start_price = hist['Close'].iloc[0]
-            end_price = hist['Close'].iloc[-1]
-            growth = ((end_price - start_price) / start_price) * 100
-            
-            currency = "USD"
-            if ticker.upper().endswith(".NS") or ticker.upper().endswith(".BO"):
-                currency = "INR"
-            elif ticker.upper().endswith(".L"):
-                currency = "GBP"
-            elif ticker.upper().endswith(".TO"):
-                currency = "CAD"
-                
-            return {
-                "current_price": round(end_price, 2),
-                "start_price_1mo": round(start_price, 2),
-                "growth_1mo_percent": round(growth, 2),
-                "currency": currency
-            }
-
-        # 2. US Market Default (Alpaca)
-        api_key = os.getenv("ALPACA_API_KEY")
-        secret_key = os.getenv("ALPACA_SECRET_KEY")
-        
-        if not api_key or not secret_key:
-            return {"error": "Alpaca API keys not configured on server"}
-
-        headers = {
-            "APCA-API-KEY-ID": api_key,
-            "APCA-API-SECRET-KEY": secret_key,
-            "Accept": "application/json"
-        }
-
-        # 1 month ago
-        end_dt = datetime.utcnow()
-        start_dt = end_dt - timedelta(days=30)
-        
-        url = f"https://data.alpaca.markets/v2/stocks/{ticker.upper()}/bars"
-        params = {
-            "timeframe": "1Day",
-            "start": start_dt.strftime('%Y-%m-%dT00:00:00Z'),
-            "end": end_dt.strftime('%Y-%m-%dT23:59:59Z'),
-            "limit": 1000,
-            "adjustment": "split",
-            "feed": "iex"
-        }
+        from app.services.finance import get_stock_history, infer_base_currency
+        from app.services.indicators import get_indicators, summarize_for_agent, TRADING_DAYS
 
-        res = requests.get(url, headers=headers, params=params)
-        if res.status_code != 200:
-            return {"error": f"Alpaca API error: {res.text}"}
-
-        bars = res.json().get("bars", [])
-        if not bars:
+        # A year of daily returns (TRADING_DAYS + 1 closes) in the listing currency covers every
+        # indicator window; 365 calendar days hold only ~250 bars, so a longer window is fetched
+        currency = infer_base_currency(ticker)
+        chart_data = get_stock_history(ticker, currency, "13M")
+        if not chart_data or not chart_data.get("history"):
             return {"error": "No stock data found"}
+        chart_data = {**chart_data, "history": chart_data["history"][-(TRADING_DAYS + 1):]}
 
-        start_price = bars[0]['c']
-        end_price = bars[-1]['c']
+        history = chart_data["history"]
+        end_price = history[-1]["price"]
+        start_price = history[max(0, len(history) - 22)]["price"]
         growth = ((end_price - start_price) / start_price) * 100
 
         return {
             "current_price": round(end_price, 2),
             "start_price_1mo": round(start_price, 2),
             "growth_1mo_percent": round(growth, 2),
-            "currency": "USD"
+            "currency": currency,
+            "technicals": summarize_for_agent(get_indicators(chart_data))
         }
     except Exception as e:
         return {"error": str(e)}
@@ -108,18 +72,29 @@ def search_market_news(query: str):
     """
     Searches for recent market news about a company or topic.
     """
-    try:
+    from app.services.resilience import hedged, ProviderUnavailable
+    from app.services.news import normalize_results, build_digest
+
+    def tavily_search():
         # Use Tavily for high-quality news
-        results = tavily_tool.invoke({"query": query})
-        content = ""
-        if isinstance(results, list):
-            content = "\n".join([r.get("content", "") for r in results])
-        else:
-            content = str(results)
-        return content
-    except Exception as e:
-        print(f"Tavily error: {e}. Fallback to DuckDuckGo...")
-        return ddg_tool.invoke(query)
+        results = get_tavily_tool().invoke({"query": query})
+        if isinstance(results, str):
+            # The tool reports API errors as text; raised so the fallback takes over
+            raise RuntimeError(results)
+        return normalize_results(results, "tavily")
+
+    try:
+        # DuckDuckGo starts if Tavily errors, is circuit-broken, or is still running after NEWS_HEDGE_AFTER
+        items = hedged(
+            ("tavily", tavily_search),
+            ("duckduckgo", lambda: normalize_results(get_ddg_tool().invoke(query), "duckduckgo")),
+            hedge_after=NEWS_HEDGE_AFTER
+        )
+    except ProviderUnavailable as e:
+        return f"News search unavailable: {e}"
+
+    # Near-duplicates dropped, ranked, and trimmed to NEWS_TOKEN_BUDGET
+    return build_digest(query, items)
 
 # Export the list of tools for the graph
 tools = [fetch_stock_data, search_market_news]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Literal
+from app.auth_utils import get_current_user
+from app.models import User
+from app.services.gemini_resolver import is_admin_email
+from app.services.llm_accounting import LEDGER
+from app.services.profiler import PROFILER
+from app.services.loop_watchdog import WATCHDOG
+
+router = APIRouter()
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if not is_admin_email(current_user.email):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+@router.get("/llm-usage")
+def get_llm_usage(
+    group: Literal["user", "ticker", "node"] = "user",
+    sort_by: Literal["input_tokens", "output_tokens", "calls", "seconds", "errors", "max_iterations"] = "input_tokens",
+    limit: int = 50,
+    admin: User = Depends(get_admin_user)
+):
+    """Aggregated Gemini usage grouped by user, ticker or graph node."""
+    return {"group": group, "rows": LEDGER.summary(group, limit=limit, sort_by=sort_by)}
+
+@router.get("/llm-usage/runs")
+def get_llm_runs(
+    min_iterations: int = 0,
+    limit: int = 50,
+    admin: User = Depends(get_admin_user)
+):
+    """Most recent analyses, newest first. Use min_iterations to spot runaway tool loops."""
+    return {"runs": LEDGER.recent_runs(limit=limit, min_iterations=min_iterations)}
+
+@router.get("/profiles")
+def list_profiles(admin: User = Depends(get_admin_user)):
+    """Request profiles held by this worker (in flight first, then newest first)."""
+    return {"profiles": PROFILER.list()}
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str, admin: User = Depends(get_admin_user)):
+    """Collapsed stacks ("thread;frame;...;frame count"), ready for flamegraph.pl or speedscope."""
+    profile = PROFILER.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (it may have been evicted or taken by another worker)")
+    return PlainTextResponse(profile.collapsed())
+
+@router.get("/event-loop")
+def get_event_loop_blocks(limit: int = 20, admin: User = Depends(get_admin_user)):
+    """Where this worker's event loop was blocked recently, worst call sites first."""
+    return WATCHDOG.report(limit=limit)
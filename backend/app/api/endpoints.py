@@ -1,16 +1,30 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, lazyload
 from pydantic import BaseModel
-from typing import Any, List, Dict, Optional
-from app.agent.graph import app as agent_app
+from datetime import datetime
+from typing import Any, List, Dict, Literal, Optional
 from app.services.finance import get_stock_history
-from app.services.cache import CacheService
+from app.services.cache import CacheService, DAILY_REPORT_LIMIT
+from app.services import report_store, report_export, sentiment_history, dashboard
+from app.services.report_search import search_reports
+from app.services.metrics import StageTimer, ANALYZE_REQUESTS
+from app.services.admission import ANALYZE_ADMISSION, TICKER_ADMISSION
+from app.services.price_hub import PRICE_HUB
+from app.services.key_scheduler import SCHEDULER, estimate_tokens, is_auth_error, is_rate_limit_error
 from app import schemas, models
 from app.db import get_db
-from app.auth_utils import get_current_user
-from app.services.finance import convert_chart_data
+from app.auth_utils import get_current_user, verify_token
+from app.services.finance import convert_chart_data, SUPPORTED_CURRENCIES
+from app.services.downsample import downsample_chart
+from app.services.http_cache import (
+    make_etag, etag_matches, not_modified, set_cache_headers, REPORT_CACHE_CONTROL, CHART_CACHE_CONTROL
+)
+from app.services.indicators import get_indicators
+from app.services.comparison import compare_symbols, MAX_SYMBOLS as MAX_COMPARE_SYMBOLS
 from app.services.gemini_resolver import resolve_gemini_key
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.agent.report_parser import IncrementalReportParser, parse_report
 
 router = APIRouter()
 
@@ -25,6 +39,11 @@ class AnalysisResponse(BaseModel):
     report_content: str
     chart_data: Optional[Dict[str, Any]] = None
     sentiment_score: Optional[int] = None
+    # Agent steps/time used for a freshly generated report (absent on cache hits)
+    budget: Optional[Dict[str, Any]] = None
+
+# How long the last served bar is trusted for chart revalidation before asking the provider again
+CHART_LAST_BAR_TTL = 300
 
 # --- Helpers ---
 def parse_agent_response(content: Any) -> str:
@@ -39,15 +58,32 @@ def parse_agent_response(content: Any) -> str:
         return "\n".join(text_parts)
     return str(content)
 
-def resolve_ticker(query: str, api_key: str) -> str:
+def report_view(report: models.Report, currency: str, max_points: Optional[int] = None) -> schemas.ReportResponse:
+    """Serializes a report, converting (and optionally downsampling) its chart without touching shared content."""
+    view = schemas.ReportResponse.model_validate(report)
+    if view.chart_data and view.chart_data.get("currency") != currency:
+        view.chart_data = convert_chart_data(view.chart_data, currency)
+    view.chart_data = downsample_chart(view.chart_data, max_points)
+    return view
+
+def resolve_ticker(query: str, api_key: str, callbacks: Optional[list] = None) -> str:
     """Uses Gemini to identify the exact stock ticker or return INVALID for gibberish."""
     try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
         # We use a fast, deterministic model for quick parsing
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=api_key, temperature=0.0)
+        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key=api_key, temperature=0.0, max_retries=1)
         prompt = f"The user entered: '{query}'. Reply with ONLY the official, currently active stock ticker symbol (e.g., AAPL). For Indian stocks, append .NS or .BO (e.g., RELIANCE.NS, TATAMOTORS.NS). Be aware of recent corporate name changes (e.g., if they ask for Zomato, return ETERNAL.NS). If the company is not publicly traded, delisted, or the query is gibberish/irrelevant, reply with ONLY the exact word 'INVALID'. Do not include any other text."
-        res = llm.invoke(prompt)
+        res = SCHEDULER.call(
+            api_key,
+            lambda: llm.invoke(prompt, config={"callbacks": callbacks, "metadata": {"node": "resolve_ticker"}}),
+            estimate_tokens(prompt),
+            caller="resolve_ticker"
+        )
         return res.content.strip().upper()
     except Exception as e:
+        # Key problems must reach the caller; only a failed lookup means "not a company"
+        if is_auth_error(e) or is_rate_limit_error(e):
+            raise
         print(f"Ticker resolution failed: {e}")
         return "INVALID"
 
@@ -56,17 +92,32 @@ def resolve_ticker(query: str, api_key: str) -> str:
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_company(
     request: QueryRequest, 
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
+    # Agent stack is imported on first use to keep API cold starts fast
+    from langchain_core.messages import AIMessageChunk
+    from app.agent.graph import initial_budget, budget_report, API_KEY_CONFIG_KEY
+    from app.agent.checkpointing import ensure_checkpointer, get_checkpointed_agent, analysis_thread_id, claim_thread, release_thread, resumable_state, discard_thread
+    from app.agent.callbacks import LLMAccountingHandler
+
+    timer = StageTimer()
+    accounting = LLMAccountingHandler(user_id=current_user.id)
+    outcome = "error"
+    base_thread_id = thread_id = api_key = None
     try:
         # 1. Resolve User API Key First
-        api_key = resolve_gemini_key(current_user)
+        with timer.stage("key_resolution"):
+            api_key = resolve_gemini_key(current_user)
         if not api_key:
             raise HTTPException(status_code=428, detail="Bring Your Own Key (BYOK) required.")
 
         # 2. Extract Official Ticker via LLM
-        query_key = resolve_ticker(request.query, api_key)
+        with timer.stage("ticker_resolution"):
+            async with TICKER_ADMISSION.slot():
+                query_key = await TICKER_ADMISSION.run_blocking(resolve_ticker, request.query, api_key, [accounting])
+        accounting.ticker = query_key
         
         if query_key == "INVALID":
             raise HTTPException(status_code=400, detail="Could not identify a publicly traded company from that query.")
@@ -75,100 +126,111 @@ async def analyze_company(
 
         # 3. CHECK CACHE (Fast Path)
         if not request.force_regenerate:
-            cached_data = CacheService.get(cache_key)
-            if cached_data:
+            with timer.stage("cache_lookup"):
+                cached_data = CacheService.get(cache_key)
+            # The cached generation is only served while its shared content row still exists
+            content = report_store.get_content(db, cached_data.get("content_hash", "")) if cached_data else None
+            if cached_data and not content:
+                print(f"🧹 STALE CACHE: {query_key} content was pruned, regenerating")
+                CacheService.delete(cache_key)
+            elif cached_data:
                 print(f"⚡ CACHE HIT: {query_key}")
+                # Attach the shared generation to this user's history (no content copy)
+                cached_data["id"] = report_store.link_report(db, current_user.id, content).id
+                ANALYZE_REQUESTS.inc(outcome="cache_hit")
+                outcome = "cache_hit"
+                response.headers["Server-Timing"] = timer.server_timing()
                 return cached_data
         else:
             print(f"🔄 FORCING REGENERATION: {query_key}")
 
         # 3.5 CHECK API LIMITS
         from app.services.gemini_resolver import is_admin_email
-        daily_usage = CacheService.get_daily_usage(current_user.id)
-        if daily_usage >= 3 and not is_admin_email(current_user.email):
+        with timer.stage("quota_check"):
+            daily_usage = CacheService.get_daily_usage(current_user.id)
+        if daily_usage >= DAILY_REPORT_LIMIT and not is_admin_email(current_user.email):
             print(f"🛑 RATE LIMIT BLOCKED FOR USER: {current_user.id}")
-            raise HTTPException(status_code=429, detail="You have reached your 3 reports per day limit.")
+            raise HTTPException(status_code=429, detail=f"You have reached your {DAILY_REPORT_LIMIT} reports per day limit.")
 
         print(f"🐢 CACHE MISS: {query_key} -> Running Agent...")
 
-        # 4. RUN AGENT (Slow Path)
-        global_curr = getattr(current_user, "global_currency", "USD")
-        initial_state = {
-            "messages": [("user", f"Analyze this company/ticker: {query_key}")], 
-            "api_key": api_key,
-            "global_currency": global_curr
-        }
-        result = await agent_app.ainvoke(initial_state)
-        raw_content = result["messages"][-1].content
-        report_text_raw = parse_agent_response(raw_content)
-        
-        import json
-        import re
-        
-        sentiment_score = 50
-        report_text = report_text_raw
-
-        try:
-            cleaned = report_text_raw.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:-3].strip()
-            elif cleaned.startswith("```"):
-                cleaned = cleaned[3:-3].strip()
-                
-            start_idx = cleaned.find("{")
-            end_idx = cleaned.rfind("}")
-            
-            if start_idx != -1 and end_idx != -1:
-                cleaned = cleaned[start_idx:end_idx+1]
-                
-            try:
-                parsed = json.loads(cleaned)
-                sentiment_score = parsed.get("score", 50)
-                report_text = parsed.get("markdown", report_text_raw)
-            except json.JSONDecodeError:
-                # Fallback: LLM generated invalid JSON (likely unescaped newlines in markdown string)
-                print(f"Native JSON parse failed. Engaging Regex Regex Extraction Fallback.")
-                score_match = re.search(r'"score"\s*:\s*(\d+)', cleaned)
-                if score_match:
-                    sentiment_score = int(score_match.group(1))
-                
-                markdown_match = re.search(r'"markdown"\s*:\s*"(.*)"\s*\}\s*$', cleaned, re.DOTALL)
-                if markdown_match:
-                    extracted_text = markdown_match.group(1)
-                    # Replace escaped quotes back to normal quotes if LLM attempted partial escaping
-                    report_text = extracted_text.replace('\\"', '"')
-        except Exception as parse_e:
-            print(f"Total failure parsing report: {parse_e}")
+        # 3.9 ADMISSION: a bounded number of agent runs per worker; excess requests queue briefly or get a 503
+        async with ANALYZE_ADMISSION.slot():
+            # 4. RUN AGENT (Slow Path)
+            global_curr = getattr(current_user, "global_currency", "USD")
+            await ensure_checkpointer()
+            agent_app = get_checkpointed_agent()
+            base_thread_id = analysis_thread_id(current_user.id, query_key, global_curr)
+            thread_id = claim_thread(base_thread_id)
+            budget = initial_budget()
+            run_config = {
+                "callbacks": [accounting],
+                # The budget normally ends the loop; the recursion limit is only a backstop
+                "recursion_limit": 2 * budget["max_steps"] + 4,
+                "configurable": {"thread_id": thread_id, API_KEY_CONFIG_KEY: api_key},
+            }
+
+            # 4.1 Resume a failed attempt from its last completed node instead of repeating paid calls
+            run_input = {
+                "messages": [("user", f"Analyze this company/ticker: {query_key}")], 
+                "global_currency": global_curr,
+                **budget
+            }
+            if await resumable_state(agent_app, run_config):
+                print(f"♻️ RESUMING CHECKPOINTED RUN: {query_key}")
+                # Fresh clock for this attempt; steps already taken still count against max_steps
+                await agent_app.aupdate_state(run_config, {"started_at": budget["started_at"], "deadline": budget["deadline"]})
+                run_input = None
+
+            with timer.stage("agent_run"):
+                # Stream the run so the final answer is parsed while Gemini is still writing it
+                report_parser = IncrementalReportParser()
+                streamed_id = None
+                result = None
+                async for mode, payload in agent_app.astream(
+                    run_input,
+                    config=run_config,
+                    stream_mode=["messages", "values"]
+                ):
+                    if mode == "values":
+                        result = payload
+                        continue
+                    chunk, metadata = payload
+                    if metadata.get("langgraph_node") not in ("agent", "finalize") or not isinstance(chunk, AIMessageChunk):
+                        continue
+                    if chunk.id != streamed_id:
+                        # A new model turn started; earlier text belonged to a tool-calling turn
+                        streamed_id = chunk.id
+                        report_parser = IncrementalReportParser()
+                    report_parser.feed(parse_agent_response(chunk.content))
+
+            with timer.stage("json_parse"):
+                final_message = result["messages"][-1]
+                if report_parser.complete and final_message.id == streamed_id:
+                    sentiment_score, report_text = report_parser.finish()
+                else:
+                    sentiment_score, report_text = parse_report(parse_agent_response(final_message.content))
         
-        # 5. FETCH VISUALS
-        try:
-            chart_data = get_stock_history(query_key, global_curr)
-        except Exception as e:
-            print(f"Chart fetch error: {e}")
-            chart_data = None
+            # 5. FETCH VISUALS
+            with timer.stage("chart_fetch"):
+                try:
+                    chart_data = await ANALYZE_ADMISSION.run_blocking(get_stock_history, query_key, global_curr)
+                except Exception as e:
+                    print(f"Chart fetch error: {e}")
+                    chart_data = None
 
         # 6. SAVE TO DATABASE (Persistent Memory)
-        db_report = db.query(models.Report).filter(
-            models.Report.company_name == query_key,
-            models.Report.owner_id == current_user.id
-        ).first()
-
-        if db_report:
-            db_report.report_content = report_text
-            db_report.chart_data = chart_data
-            db_report.sentiment_score = sentiment_score
-        else:
-            db_report = models.Report(
+        with timer.stage("db_save"):
+            content = report_store.get_or_create_content(
+                db,
                 company_name=query_key,
                 report_content=report_text,
                 chart_data=chart_data,
-                sentiment_score=sentiment_score,
-                owner_id=current_user.id
+                sentiment_score=sentiment_score
             )
-            db.add(db_report)
-            
-        db.commit()
-        db.refresh(db_report)
+            # Committed together with the report link below
+            sentiment_history.record_sentiment(db, query_key, sentiment_score, content.content_hash)
+            db_report = report_store.link_report(db, current_user.id, content)
         
         # 6.5 INCREMENT DAILY LIMIT AFTER SUCCESS
         CacheService.increment_daily_usage(current_user.id)
@@ -179,50 +241,109 @@ async def analyze_company(
             "company_name": query_key,
             "report_content": report_text,
             "chart_data": chart_data,
-            "sentiment_score": sentiment_score
+            "sentiment_score": sentiment_score,
+            "content_hash": content.content_hash
         }
 
         # 8. SAVE TO CACHE (12 Hour TTL)
-        CacheService.set(cache_key, response_data, expire_seconds=43200)
+        with timer.stage("cache_write"):
+            CacheService.set(cache_key, response_data, expire_seconds=43200)
+
+        # The report is persisted, so the run's checkpoints are no longer needed
+        await discard_thread(thread_id)
 
-        return response_data
+        ANALYZE_REQUESTS.inc(outcome="generated")
+        outcome = "ok"
+        response.headers["Server-Timing"] = timer.server_timing()
+        return {**response_data, "budget": budget_report(result)}
 
     except HTTPException as http_exc:
         # Re-raise the HTTP exception specifically so the 428 bypasses the generic catch
+        ANALYZE_REQUESTS.inc(outcome=f"http_{http_exc.status_code}")
+        outcome = f"http_{http_exc.status_code}"
         raise http_exc
     except Exception as e:
         error_str = str(e).lower()
         print(f"Error in analysis: {error_str}")
+        ANALYZE_REQUESTS.inc(outcome="error")
         
-        # Check for invalid key, quota exhaustion, or other generative AI auth errors
-        if any(keyword in error_str for keyword in [
-            "api key not valid", "api_key_invalid", "quota", "429", "exhausted", "403", "401"
-        ]):
-            # The saved key was invalid or exhausted. Delete it so the user is prompted again.
+        # Rate limits are transient: keep the key and tell the client when to retry
+        if is_rate_limit_error(e):
+            retry_after = int(getattr(e, "retry_after", 60))
+            raise HTTPException(
+                status_code=429,
+                detail="Your Gemini API key is rate limited. Please retry shortly.",
+                headers={"Retry-After": str(max(1, retry_after))}
+            )
+
+        # Only a rejected key is deleted, so the user is prompted for a new one
+        if is_auth_error(e):
             from app.services.supabase_client import delete_user_gemini_key
+            from app.services.gemini_resolver import invalidate_key_status
             if hasattr(current_user, "supabase_uid") and current_user.supabase_uid:
                 delete_user_gemini_key(current_user.supabase_uid)
+                invalidate_key_status(current_user)
             raise HTTPException(status_code=428, detail="Key invalid or exhausted. Please provide a new API key.")
             
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await release_thread(base_thread_id, thread_id, secret=api_key)
+        accounting.finish(outcome)
 
 @router.get("/reports", response_model=List[schemas.ReportResponse])
 def get_user_reports(
+    response: Response,
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Fetch all reports generated by the logged-in user."""
+    user_currency = getattr(current_user, "global_currency", "USD")
+
+    # Cheap (id, version) scan first, so an unchanged list never loads the report bodies
+    versions = db.query(models.Report.id, models.Report.version).filter(
+        models.Report.owner_id == current_user.id
+    ).order_by(models.Report.created_at.desc()).all()
+    etag = make_etag("reports", [tuple(row) for row in versions], user_currency, max_points)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, REPORT_CACHE_CONTROL)
+
     reports = db.query(models.Report).filter(models.Report.owner_id == current_user.id).order_by(models.Report.created_at.desc()).all()
     
     # Process chart data conversions based on user's current preferences
-    user_currency = getattr(current_user, "global_currency", "USD")
-    for report in reports:
-        if report.chart_data and report.chart_data.get("currency") != user_currency:
-            converted = convert_chart_data(report.chart_data, user_currency)
-            # Update DB (optional, but good for subsequent reads and dashboard performance)
-            report.chart_data = converted
-            db.commit()
-    return reports
+    set_cache_headers(response, etag, REPORT_CACHE_CONTROL)
+    return [report_view(report, user_currency, max_points) for report in reports]
+
+@router.get("/reports/search", response_model=schemas.ReportSearchResponse)
+def search_user_reports(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Ranked full-text search over the user's reports (company name and memo text)."""
+    total, results = search_reports(db, current_user.id, q, limit=limit, offset=offset)
+    return {"query": q, "total": total, "limit": limit, "offset": offset, "results": results}
+
+@router.get("/reports/export")
+def export_user_reports(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    compress: Optional[Literal["zstd"]] = None,
+    include_chart: bool = False,
+    current_user: models.User = Depends(get_current_user)
+):
+    """Streams every report of the user as NDJSON or CSV (optionally zstd-compressed)."""
+    media_type, extension = report_export.FORMATS[format]
+    filename = f"signalforge-reports-{datetime.utcnow():%Y%m%d}.{extension}"
+    if compress == "zstd":
+        media_type, filename = "application/zstd", filename + ".zst"
+    return StreamingResponse(
+        report_export.export_reports(current_user.id, format, compress, include_chart),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
 
 @router.delete("/reports/{report_id}")
 def delete_report(
@@ -238,18 +359,21 @@ def delete_report(
     # Clean up the Redis Cache so it forces a fresh regeneration next time
     CacheService.delete(f"report:{report.company_name}")
     
-    db.delete(report)
-    db.commit()
+    report_store.delete_report(db, report)
     return {"status": "deleted", "id": report_id}
 
 @router.get("/reports/{report_id}", response_model=schemas.ReportResponse)
 def get_report(
     report_id: int,
+    response: Response,
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Fetch a single report by ID."""
-    report = db.query(models.Report).filter(
+    # The shared content (report body, chart) is only loaded if the client's copy is stale
+    report = db.query(models.Report).options(lazyload(models.Report.content)).filter(
         models.Report.id == report_id, 
         models.Report.owner_id == current_user.id
     ).first()
@@ -258,22 +382,26 @@ def get_report(
         raise HTTPException(status_code=404, detail="Report not found")
         
     user_currency = getattr(current_user, "global_currency", "USD")
-    if report.chart_data and report.chart_data.get("currency") != user_currency:
-        converted = convert_chart_data(report.chart_data, user_currency)
-        report.chart_data = converted
-        db.commit()
-        
-    return report
+    etag = make_etag("report", report.id, report.version, user_currency, max_points)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, REPORT_CACHE_CONTROL)
+
+    set_cache_headers(response, etag, REPORT_CACHE_CONTROL)
+    return report_view(report, user_currency, max_points)
 
 @router.get("/reports/{report_id}/chart", response_model=Dict[str, Any])
 def get_report_chart(
     report_id: int,
+    response: Response,
     timeframe: str = "3M",
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    indicators: bool = False,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Fetch an on-demand chart for an existing report with a dynamically requested timeframe."""
-    report = db.query(models.Report).filter(
+    report = db.query(models.Report).options(lazyload(models.Report.content)).filter(
         models.Report.id == report_id, 
         models.Report.owner_id == current_user.id
     ).first()
@@ -282,11 +410,91 @@ def get_report_chart(
         raise HTTPException(status_code=404, detail="Report not found")
         
     global_curr = getattr(current_user, "global_currency", "USD")
-    chart_data = get_stock_history(report.company_name, global_curr, timeframe)
+    symbol = report.company_name
+
+    # 1. Revalidate against the last bar we served, without calling the provider
+    last_bar_key = f"chart_last_bar:{symbol}:{timeframe}:{global_curr}"
+    last_bar = CacheService.get(last_bar_key)
+    if last_bar:
+        etag = make_etag("chart", symbol, timeframe, global_curr, last_bar, max_points, indicators)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, CHART_CACHE_CONTROL)
+
+    # 2. Fetch and remember the last bar for the next revalidation
+    chart_data = get_stock_history(symbol, global_curr, timeframe)
     
     if not chart_data:
         raise HTTPException(status_code=500, detail="Failed to fetch chart data from financial provider.")
+
+    last_bar = chart_data["history"][-1]
+    CacheService.set(last_bar_key, last_bar, expire_seconds=CHART_LAST_BAR_TTL)
+    etag = make_etag("chart", symbol, timeframe, global_curr, last_bar, max_points, indicators)
+    set_cache_headers(response, etag, CHART_CACHE_CONTROL)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CHART_CACHE_CONTROL)
         
+    if indicators:
+        # Computed on the full-resolution series, before any downsampling
+        chart_data = {**chart_data, "indicators": get_indicators(chart_data)}
+
     # Technically we don't *have* to persist toggled timeframe views to the DB, 
     # but we will just return it directly so the UI can swap it instantly.
-    return chart_data
\ No newline at end of file
+    return downsample_chart(chart_data, max_points)
+
+@router.get("/compare", response_model=Dict[str, Any])
+def compare_tickers(
+    symbols: str = Query(..., description="Comma-separated tickers, e.g. AAPL,MSFT,RELIANCE.NS"),
+    timeframe: Literal["1M", "3M", "1Y", "5Y"] = "3M",
+    current_user: models.User = Depends(get_current_user)
+):
+    """Aligned base-100 performance and return correlations for several tickers in the user's currency."""
+    # Normalized before counting, so "AAPL,aapl" is one symbol, not a comparison
+    tickers = list(dict.fromkeys(s.upper().strip() for s in symbols.split(",") if s.strip()))
+    if len(tickers) < 2:
+        raise HTTPException(status_code=400, detail="Provide at least two symbols to compare.")
+    if len(tickers) > MAX_COMPARE_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_SYMBOLS} symbols can be compared at once.")
+
+    global_curr = getattr(current_user, "global_currency", "USD")
+    comparison = compare_symbols(tickers, global_curr, timeframe)
+    if not comparison["history"]:
+        raise HTTPException(status_code=500, detail="Failed to fetch chart data from financial provider.")
+    return comparison
+
+@router.get("/sentiment/{ticker}", response_model=Dict[str, Any])
+def get_sentiment_history(
+    ticker: str,
+    days: int = Query(90, ge=1, le=1825),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Daily mean/min/max sentiment for a ticker across all generated reports."""
+    return sentiment_history.get_sentiment_series(db, ticker, days)
+
+@router.get("/dashboard/summary", response_model=Dict[str, Any])
+def get_dashboard_summary(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Counts, sentiment mix, recent tickers, today's quota and key status in one call."""
+    return dashboard.get_summary(db, current_user)
+
+@router.websocket("/ws/prices")
+async def price_stream(websocket: WebSocket, token: Optional[str] = None, currency: Optional[str] = None):
+    """
+    Live prices. Connect with ?token=<access token>, then send
+    {"action": "subscribe"|"unsubscribe", "symbols": ["AAPL", ...]}.
+    """
+    try:
+        payload = await run_in_threadpool(verify_token, token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    target = (currency or (payload.get("user_metadata") or {}).get("global_currency") or "USD").upper()
+    if target not in SUPPORTED_CURRENCIES:
+        await websocket.send_json({"type": "error", "detail": f"Unsupported currency: {target}."})
+        await websocket.close(code=1008)
+        return
+    await PRICE_HUB.serve(websocket, target)
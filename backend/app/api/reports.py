@@ -4,6 +4,7 @@ from typing import List
 from app.db import get_db
 from app import models, schemas
 from app import auth_utils 
+from app.services import report_store
 
 router = APIRouter()
 
@@ -14,11 +15,8 @@ def create_report(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth_utils.get_current_user) 
 ):
-    db_report = models.Report(**report.dict(), owner_id=current_user.id)
-    db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
-    return db_report
+    content = report_store.get_or_create_content(db, **report.dict())
+    return report_store.link_report(db, current_user.id, content, replace_existing=False)
 
 # 2. GET ALL REPORTS
 @router.get("/", response_model=List[schemas.ReportResponse])
@@ -61,6 +59,5 @@ def delete_report(
     if report.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this report")
         
-    db.delete(report)
-    db.commit()
+    report_store.delete_report(db, report)
     return
\ No newline at end of file
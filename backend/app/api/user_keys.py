@@ -6,7 +6,7 @@ from app.auth_utils import get_current_user
 from app.models import User
 from app.services.supabase_client import set_user_gemini_key, delete_user_gemini_key
 from app.services.encryption import encrypt_key
-from app.services.gemini_resolver import resolve_gemini_key
+from app.services.gemini_resolver import has_gemini_key, invalidate_key_status
 
 router = APIRouter()
 
@@ -15,9 +15,8 @@ class KeyRequest(BaseModel):
 
 @router.get("/gemini-key/status")
 def get_key_status(current_user: User = Depends(get_current_user)):
-    # Re-use the JIT resolver to see if a key is available
-    key = resolve_gemini_key(current_user)
-    return {"hasKey": key is not None}
+    # Re-use the JIT resolver to see if a key is available (cached briefly)
+    return {"hasKey": has_gemini_key(current_user)}
 
 @router.post("/gemini-key")
 def set_key(request: KeyRequest, current_user: User = Depends(get_current_user)):
@@ -27,6 +26,7 @@ def set_key(request: KeyRequest, current_user: User = Depends(get_current_user))
     try:
         encrypted_key = encrypt_key(request.api_key)
         success = set_user_gemini_key(current_user.supabase_uid, encrypted_key)
+        invalidate_key_status(current_user)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save key to Supabase.")
         return {"status": "success"}
@@ -39,6 +39,7 @@ def delete_key(current_user: User = Depends(get_current_user)):
         return {"status": "ignored"}
         
     success = delete_user_gemini_key(current_user.supabase_uid)
+    invalidate_key_status(current_user)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete key from Supabase.")
     return {"status": "deleted"}
@@ -48,10 +49,10 @@ def purge_user_data(db: Session = Depends(get_db), current_user: User = Depends(
     # 1. Delete Gemini Key
     if hasattr(current_user, "supabase_uid") and current_user.supabase_uid:
         delete_user_gemini_key(current_user.supabase_uid)
+        invalidate_key_status(current_user)
         
-    # 2. Delete all models.Report for this user
-    from app.models import Report
-    db.query(Report).filter(Report.owner_id == current_user.id).delete()
-    db.commit()
+    # 2. Delete all reports for this user (shared contents are kept while referenced)
+    from app.services import report_store
+    report_store.delete_user_reports(db, current_user.id)
     
     return {"status": "purged"}
@@ -1,5 +1,6 @@
 import os
 import jwt
+from typing import Optional
 from jwt import PyJWKClient
 from passlib.context import CryptContext
 from dotenv import load_dotenv
@@ -40,14 +41,8 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 # --- AUTH LOGIC ---
-def get_current_user(
-    token_oauth: str = Depends(oauth2_scheme),
-    token_bearer: HTTPAuthorizationCredentials = Depends(http_bearer),
-    db: Session = Depends(get_db)
-):
-    # 1. Resolve Token
-    token = token_oauth if token_oauth else (token_bearer.credentials if token_bearer else None)
-    
+def verify_token(token: Optional[str]) -> dict:
+    """Verifies a Supabase (or legacy HS256) access token and returns its claims."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -58,7 +53,7 @@ def get_current_user(
         raise credentials_exception
 
     try:
-        # 2. PEEK AT HEADER
+        # 1. PEEK AT HEADER
         unverified_header = jwt.get_unverified_header(token)
         alg = unverified_header.get("alg")
 
@@ -99,9 +94,8 @@ def get_current_user(
             print(f"❌ Unknown Algorithm: {alg}")
             raise credentials_exception
 
-        # 3. EXTRACT USER INFO
-        email = payload.get("email")
-        if not email:
+        # 2. EXTRACT USER INFO
+        if not payload.get("email"):
             raise credentials_exception
 
     except jwt.ExpiredSignatureError:
@@ -113,7 +107,21 @@ def get_current_user(
         print(f"Auth Unexpected Error: {str(e)}")
         raise credentials_exception
 
-    # 4. SYNC TO DATABASE
+    return payload
+
+def get_current_user(
+    token_oauth: str = Depends(oauth2_scheme),
+    token_bearer: HTTPAuthorizationCredentials = Depends(http_bearer),
+    db: Session = Depends(get_db)
+):
+    # 1. Resolve Token
+    token = token_oauth if token_oauth else (token_bearer.credentials if token_bearer else None)
+
+    # 2. Verify it
+    payload = verify_token(token)
+    email = payload.get("email")
+
+    # 3. SYNC TO DATABASE
     user = db.query(models.User).filter(models.User.email == email).first()
     if not user:
         print(f"🆕 Syncing Supabase User to Local DB: {email}")
@@ -0,0 +1,79 @@
+"""
+Creates the database schema and applies in-place upgrades. Run once per deploy
+(release phase / init container):
+
+    python -m app.init_db
+
+The API no longer runs this on every worker start; set DB_AUTO_CREATE=1 to
+restore that for local development.
+"""
+import json
+from sqlalchemy import inspect, text
+from app import models
+from app.db import engine, SessionLocal
+from app.services.report_search import setup_search_index
+
+def _ensure_column(table: str, column: str, ddl: str):
+    """Adds a column that create_all() cannot add to an already existing table."""
+    columns = {c["name"] for c in inspect(engine).get_columns(table)}
+    if column not in columns:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        print(f"🔧 Added column {table}.{column}")
+
+def _migrate_inline_reports():
+    """Moves report bodies stored inline on `reports` (before content addressing) into report_contents."""
+    _ensure_column("reports", "content_id", "INTEGER REFERENCES report_contents(id)")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reports_content_id ON reports (content_id)"))
+
+    columns = {c["name"] for c in inspect(engine).get_columns("reports")}
+    if "report_content" not in columns:
+        return
+
+    from app.services import report_store
+    db = SessionLocal()
+    try:
+        rows = db.execute(text(
+            "SELECT id, company_name, report_content, chart_data, sentiment_score FROM reports "
+            "WHERE content_id IS NULL AND report_content IS NOT NULL"
+        )).fetchall()
+        for row in rows:
+            chart_data = json.loads(row.chart_data) if isinstance(row.chart_data, str) else row.chart_data
+            content = report_store.get_or_create_content(db, row.company_name, row.report_content, chart_data, row.sentiment_score)
+            db.execute(
+                text("UPDATE reports SET content_id = :content_id, report_content = NULL, chart_data = NULL WHERE id = :id"),
+                {"content_id": content.id, "id": row.id}
+            )
+        db.commit()
+        if rows:
+            print(f"🔧 Moved {len(rows)} inline reports into report_contents")
+    finally:
+        db.close()
+
+def _backfill_sentiment_history():
+    """Seeds the sentiment history from existing report contents the first time it is created."""
+    from app.services.sentiment_history import record_sentiment
+    db = SessionLocal()
+    try:
+        if db.query(models.SentimentObservation.id).first() is not None:
+            return
+        contents = db.query(models.ReportContent).filter(models.ReportContent.sentiment_score.isnot(None)).all()
+        for content in contents:
+            record_sentiment(db, content.company_name, content.sentiment_score, content.content_hash, content.created_at)
+        db.commit()
+        if contents:
+            print(f"🔧 Seeded sentiment history from {len(contents)} reports")
+    finally:
+        db.close()
+
+def init_db():
+    models.Base.metadata.create_all(bind=engine)
+    _migrate_inline_reports()
+    _ensure_column("reports", "version", "INTEGER NOT NULL DEFAULT 1")
+    _backfill_sentiment_history()
+    setup_search_index(engine)
+
+if __name__ == "__main__":
+    init_db()
+    print("✅ Database Tables Verified")
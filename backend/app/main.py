@@ -3,11 +3,12 @@ from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from redis import asyncio as aioredis
 from fastapi_limiter import FastAPILimiter
-from app import models
-from app.db import engine
-from app.api import endpoints, auth, reports, user_keys
+from app.api import endpoints, auth, reports, user_keys, admin
+from app.services.metrics import render_metrics
+from app.services.profiler import ProfilingMiddleware
 
 # Load Env Vars
 load_dotenv()
@@ -15,9 +16,11 @@ load_dotenv()
 # Lifespan event to handle startup and shutdown tasks
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 1. Create DB Tables
-    models.Base.metadata.create_all(bind=engine)
-    print("✅ Database Tables Verified")
+    # 1. Create DB Tables (opt-in; deploys run `python -m app.init_db` instead)
+    if os.getenv("DB_AUTO_CREATE", "").lower() in ("1", "true", "yes"):
+        from app.init_db import init_db
+        init_db()
+        print("✅ Database Tables Verified")
 
     # 2. Connect to Redis (Using Env Var)
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
@@ -28,8 +31,21 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️ Redis Connection Failed: {e}")
     
+    # 3. Watch the event loop for blocking calls
+    from app.services.loop_watchdog import start_loop_watchdog, stop_loop_watchdog
+    start_loop_watchdog()
+
     yield
     
+    await stop_loop_watchdog()
+    
+    # The agent checkpointer is opened by the first analysis, not at startup
+    from app.agent.checkpointing import close_checkpointer
+    await close_checkpointer()
+
+    from app.services.price_hub import PRICE_HUB
+    await PRICE_HUB.close()
+
     # Close Redis on shutdown if it was initialized
     try:
         await redis.close()
@@ -51,18 +67,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After", "X-Profile-Id"],
 )
 
+# Sampling profiler for admin-requested and slow requests (see services/profiler.py)
+app.add_middleware(ProfilingMiddleware)
+
 # Connect Routes
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(user_keys.router, prefix="/api/user", tags=["user"])
 app.include_router(endpoints.router, prefix="/api", tags=["agent"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "service": "SignalForge Agent"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus scrape target (text exposition format)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def read_root():
     return {"status": "SignalForge Backend Running"}
\ No newline at end of file
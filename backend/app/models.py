@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from app.db import Base 
 import datetime
@@ -12,16 +12,78 @@ class User(Base):
     
     reports = relationship("Report", back_populates="owner")
 
-class Report(Base):
-    __tablename__ = "reports"
+class ReportContent(Base):
+    """A generated report, stored once and shared by every user who references it."""
+    __tablename__ = "report_contents"
 
     id = Column(Integer, primary_key=True, index=True)
+    # sha256 of the canonical report payload (see services/report_store.py)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
     company_name = Column(String, index=True)
     report_content = Column(Text)
     chart_data = Column(JSON, nullable=True)
     sentiment_score = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    references = relationship("Report", back_populates="content")
+
+class Report(Base):
+    """A user's reference to a shared ReportContent (one row per user and ticker)."""
+    __tablename__ = "reports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_name = Column(String, index=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
     
     # Foreign Key to link report to a user
     owner_id = Column(Integer, ForeignKey("users.id"))
-    owner = relationship("User", back_populates="reports")
\ No newline at end of file
+    owner = relationship("User", back_populates="reports")
+
+    content_id = Column(Integer, ForeignKey("report_contents.id"), index=True)
+    content = relationship("ReportContent", back_populates="references", lazy="joined")
+
+    # Bumped by report_store.link_report whenever the report changes; part of the report ETags
+    # (see services/http_cache.py). A counter, not an optimistic lock: concurrent relinks both win
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Read-through accessors so API schemas keep serializing Report rows unchanged
+    @property
+    def report_content(self):
+        return self.content.report_content if self.content else None
+
+    @property
+    def chart_data(self):
+        return self.content.chart_data if self.content else None
+
+    @property
+    def sentiment_score(self):
+        return self.content.sentiment_score if self.content else None
+
+class SentimentObservation(Base):
+    """Append-only: one row per freshly generated report's sentiment score."""
+    __tablename__ = "sentiment_observations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, nullable=False)
+    score = Column(Integer, nullable=False)
+    observed_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    # Not a foreign key: contents are pruned when unreferenced, the history is kept
+    content_hash = Column(String(64), nullable=True)
+
+    __table_args__ = (Index("ix_sentiment_observations_ticker_observed_at", "ticker", "observed_at"),)
+
+class SentimentDailyRollup(Base):
+    """Per-ticker daily aggregate of SentimentObservation, upserted as observations arrive."""
+    __tablename__ = "sentiment_daily_rollups"
+
+    ticker = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    score_min = Column(Integer, nullable=False)
+    score_max = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    @property
+    def mean(self):
+        return round(self.score_sum / self.count, 2) if self.count else None
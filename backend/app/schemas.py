@@ -36,4 +36,19 @@ class ReportResponse(ReportBase):
     owner_id: int 
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Search Schemas ---
+class ReportSearchHit(BaseModel):
+    id: int
+    company_name: str
+    created_at: datetime
+    snippet: str
+    rank: float
+
+class ReportSearchResponse(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[ReportSearchHit]
@@ -0,0 +1,112 @@
+import os
+import math
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from app.services.metrics import Counter, Gauge, Histogram
+
+# Admission control for expensive endpoints. Each pool admits `max_concurrent` requests,
+# lets up to `max_queue` more wait (at most `queue_timeout` seconds), and rejects the rest
+# immediately with 503 + Retry-After. Limits are per worker process.
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "signalforge_admission_in_flight",
+    "Requests currently holding an admission slot.",
+    ("pool",),
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "signalforge_admission_queue_depth",
+    "Requests waiting for an admission slot.",
+    ("pool",),
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "signalforge_admission_wait_seconds",
+    "Time admitted requests spent queued.",
+    ("pool",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+ADMISSION_REJECTED = Counter(
+    "signalforge_admission_rejected_total",
+    "Requests shed by admission control (queue_full, queue_timeout).",
+    ("pool", "reason"),
+)
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._in_flight = 0
+        # Smoothed time a slot is held, for the Retry-After estimate
+        self._avg_service_seconds = 10.0
+        # Blocking work of admitted requests runs here, not in the threadpool the cheap endpoints use
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent * 2, thread_name_prefix=f"{name}-worker")
+
+    def retry_after(self) -> int:
+        backlog = self._waiting + 1
+        return max(1, math.ceil(self._avg_service_seconds * backlog / self.max_concurrent))
+
+    def _reject(self, reason: str):
+        ADMISSION_REJECTED.inc(pool=self.name, reason=reason)
+        retry_after = self.retry_after()
+        print(f"🚦 Shedding {self.name} request ({reason}), retry after {retry_after}s")
+        raise HTTPException(
+            status_code=503,
+            detail="The analysis service is at capacity. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    @asynccontextmanager
+    async def slot(self):
+        # Counted synchronously (before any await) so a burst cannot overfill the queue
+        if self._in_flight + self._waiting >= self.max_concurrent + self.max_queue:
+            self._reject("queue_full")
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        ADMISSION_QUEUE_DEPTH.set(self._waiting, pool=self.name)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject("queue_timeout")
+        finally:
+            self._waiting -= 1
+            ADMISSION_QUEUE_DEPTH.set(self._waiting, pool=self.name)
+
+        admitted_at = time.perf_counter()
+        ADMISSION_WAIT_SECONDS.observe(admitted_at - queued_at, pool=self.name)
+        self._in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self._in_flight, pool=self.name)
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            self._in_flight -= 1
+            ADMISSION_IN_FLIGHT.set(self._in_flight, pool=self.name)
+            held = time.perf_counter() - admitted_at
+            self._avg_service_seconds = 0.8 * self._avg_service_seconds + 0.2 * held
+
+    async def run_blocking(self, fn, *args):
+        """Runs a blocking call on this pool's executor without stalling the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, lambda: fn(*args))
+
+ANALYZE_ADMISSION = AdmissionController(
+    "analyze",
+    max_concurrent=int(os.getenv("ANALYZE_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("ANALYZE_MAX_QUEUE", "8")),
+    queue_timeout=float(os.getenv("ANALYZE_QUEUE_TIMEOUT_SECONDS", "30")),
+)
+
+# Ticker resolution is one short LLM call made before the cache lookup, so it gets its own
+# bounded pool: cache hits never wait behind agent runs, and a burst is shed instead of queuing
+TICKER_ADMISSION = AdmissionController(
+    "resolve_ticker",
+    max_concurrent=int(os.getenv("TICKER_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("TICKER_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("TICKER_QUEUE_TIMEOUT_SECONDS", "10")),
+)
@@ -1,53 +1,95 @@
 import redis
 import os
 import json
-from typing import Optional, Any
+import time
+from typing import Any, List, Optional
+from app.services.metrics import CACHE_REQUESTS
 
-# Initialize Redis Connection
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# How long to wait before retrying after a failed connection attempt
+REDIS_RETRY_SECONDS = 30
+# Fresh analyses per user per UTC day (admins are exempt)
+DAILY_REPORT_LIMIT = 3
 
-try:
-    r = redis.from_url(REDIS_URL, decode_responses=True)
-    # Fast ping to check connection
-    r.ping()
-    print("✅ Redis Connected")
-except redis.ConnectionError:
-    print("⚠️ Warning: Redis not connected. Caching disabled.")
-    r = None
+_client = None
+_last_failure = 0.0
+
+def get_redis() -> Optional[redis.Redis]:
+    """Connects to Redis on first use (not at import), so cold starts never block on the network."""
+    global _client, _last_failure
+    if _client is not None:
+        return _client
+    if _last_failure and time.monotonic() - _last_failure < REDIS_RETRY_SECONDS:
+        return None
+    try:
+        client = redis.from_url(REDIS_URL, decode_responses=True, socket_connect_timeout=2)
+        # Fast ping to check connection
+        client.ping()
+        print("✅ Redis Connected")
+        _client = client
+    except (redis.ConnectionError, redis.TimeoutError):
+        # A connect timeout raises TimeoutError, which is not a ConnectionError
+        print("⚠️ Warning: Redis not connected. Caching disabled.")
+        _last_failure = time.monotonic()
+    return _client
 
 class CacheService:
     @staticmethod
     def get(key: str) -> Optional[Any]:
+        r = get_redis()
         if not r: return None
         data = r.get(key)
+        namespace = key.split(":", 1)[0]
         if data:
+            CACHE_REQUESTS.inc(namespace=namespace, result="hit")
             return json.loads(data)
+        CACHE_REQUESTS.inc(namespace=namespace, result="miss")
         return None
 
+    @staticmethod
+    def get_many(keys: List[str]) -> List[Optional[Any]]:
+        """Reads several keys in one round trip (pipelined MGET)."""
+        r = get_redis()
+        if not r: return [None] * len(keys)
+        pipe = r.pipeline(transaction=False)
+        pipe.mget(keys)
+        values = pipe.execute()[0]
+        results = []
+        for key, data in zip(keys, values):
+            CACHE_REQUESTS.inc(namespace=key.split(":", 1)[0], result="hit" if data else "miss")
+            results.append(json.loads(data) if data else None)
+        return results
+
     @staticmethod
     def set(key: str, value: Any, expire_seconds: int = 3600):
+        r = get_redis()
         if not r: return
         r.setex(key, expire_seconds, json.dumps(value))
 
     @staticmethod
     def delete(key: str):
+        r = get_redis()
         if not r: return
         r.delete(key)
 
     @staticmethod
-    def get_daily_usage(user_id: int) -> int:
-        if not r: return 0
+    def daily_usage_key(user_id: int) -> str:
         from datetime import datetime
         today = datetime.utcnow().strftime('%Y-%m-%d')
-        key = f"rate_limit:{user_id}:{today}"
+        return f"rate_limit:{user_id}:{today}"
+
+    @staticmethod
+    def get_daily_usage(user_id: int) -> int:
+        r = get_redis()
+        if not r: return 0
+        key = CacheService.daily_usage_key(user_id)
         val = r.get(key)
         return int(val) if val else 0
 
     @staticmethod
     def increment_daily_usage(user_id: int):
+        r = get_redis()
         if not r: return
-        from datetime import datetime
-        today = datetime.utcnow().strftime('%Y-%m-%d')
-        key = f"rate_limit:{user_id}:{today}"
+        key = CacheService.daily_usage_key(user_id)
         r.incr(key)
         r.expire(key, 86400 * 2) # Auto-delete after 2 days to save space
\ No newline at end of file
@@ -0,0 +1,70 @@
+from typing import Any, Dict, List
+from app.services.cache import CacheService
+from app.services.finance import get_histories
+
+MAX_SYMBOLS = 10
+
+def align_histories(charts: Dict[str, Dict[str, Any]]):
+    """
+    One column per symbol on the union of all trading dates. Returns (prices, observed):
+    gaps from market holidays are forward-filled in `prices`, `observed` marks real bars,
+    and dates before every symbol has a first bar are dropped from both.
+    """
+    import pandas as pd
+
+    raw = pd.DataFrame({
+        symbol: pd.Series(
+            [point["price"] for point in chart["history"]],
+            index=pd.to_datetime([point["date"] for point in chart["history"]])
+        )
+        for symbol, chart in charts.items()
+    }).sort_index()
+    prices = raw.ffill().dropna()
+    return prices, raw.loc[prices.index].notna()
+
+def compare_symbols(symbols: List[str], target_currency: str = "USD", timeframe: str = "3M") -> Dict[str, Any]:
+    """Aligned, currency-converted, base-100 series plus daily-return correlations for several tickers."""
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s.strip()))
+    cache_key = f"compare:{','.join(sorted(symbols))}:{timeframe}:{target_currency}"
+    cached = CacheService.get(cache_key)
+    if cached:
+        return cached
+
+    charts = get_histories(symbols, target_currency, timeframe)
+    missing = [s for s in symbols if s not in charts]
+    result: Dict[str, Any] = {
+        "currency": target_currency,
+        "timeframe": timeframe,
+        "symbols": [s for s in symbols if s in charts],
+        "missing": missing,
+        "history": [],
+        "returns_pct": {},
+        "correlation": {},
+    }
+    if not charts:
+        return result
+
+    prices, observed = align_histories(charts)
+    if prices.empty:
+        return result
+
+    normalized = (prices / prices.iloc[0] * 100).round(2)
+    # Correlate real bars only: forward-filled holiday rows would add fake zero returns
+    returns = prices.pct_change().where(observed).iloc[1:]
+    correlation = returns.corr(min_periods=2).round(3)
+
+    dates = normalized.index.strftime("%Y-%m-%d")
+    result["history"] = [
+        {"date": date, **values}
+        for date, values in zip(dates, normalized.to_dict(orient="records"))
+    ]
+    result["returns_pct"] = ((prices.iloc[-1] / prices.iloc[0] - 1) * 100).round(2).to_dict()
+    result["correlation"] = {
+        row: {col: (None if value != value else float(value)) for col, value in cols.items()}
+        for row, cols in correlation.to_dict(orient="index").items()
+    }
+
+    # Only cache complete answers, so a transient provider failure is retried on the next call
+    if not missing:
+        CacheService.set(cache_key, result, expire_seconds=300)
+    return result
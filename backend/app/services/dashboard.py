@@ -0,0 +1,101 @@
+import datetime
+from typing import Any, Dict
+from sqlalchemy import DateTime, text
+from sqlalchemy.orm import Session
+from app.services.cache import CacheService, DAILY_REPORT_LIMIT
+
+# Dashboard summary: report aggregates from one windowed SQL query, cached per user until
+# the user's reports change; quota and key status come fresh from the same pipelined Redis read.
+
+SUMMARY_TTL_SECONDS = 60
+RECENT_LIMIT = 5
+BULLISH_MIN_SCORE = 60
+BEARISH_MAX_SCORE = 40
+
+# Window aggregates are computed over all of the user's rows before the outer filter
+# keeps only the most recent ones, so one round trip returns both.
+_SUMMARY_SQL = text("""
+    WITH mine AS (
+        SELECT r.id, r.company_name, r.created_at, c.sentiment_score,
+               ROW_NUMBER() OVER (ORDER BY r.created_at DESC, r.id DESC) AS rn,
+               COUNT(*) OVER () AS total,
+               AVG(c.sentiment_score) OVER () AS avg_score,
+               SUM(CASE WHEN c.sentiment_score >= :bullish THEN 1 ELSE 0 END) OVER () AS bullish,
+               SUM(CASE WHEN c.sentiment_score <= :bearish THEN 1 ELSE 0 END) OVER () AS bearish,
+               SUM(CASE WHEN r.created_at >= :week_ago THEN 1 ELSE 0 END) OVER () AS last_7d
+        FROM reports r
+        LEFT JOIN report_contents c ON c.id = r.content_id
+        WHERE r.owner_id = :owner_id
+    )
+    SELECT id, company_name, created_at, sentiment_score, total, avg_score, bullish, bearish, last_7d
+    FROM mine
+    WHERE rn <= :recent
+    ORDER BY rn
+""").columns(created_at=DateTime)
+
+def summary_cache_key(owner_id: int) -> str:
+    return f"dashboard:{owner_id}"
+
+def invalidate_summary(owner_id: int):
+    CacheService.delete(summary_cache_key(owner_id))
+
+def _aggregate(db: Session, owner_id: int) -> Dict[str, Any]:
+    rows = db.execute(_SUMMARY_SQL, {
+        "owner_id": owner_id,
+        "recent": RECENT_LIMIT,
+        "bullish": BULLISH_MIN_SCORE,
+        "bearish": BEARISH_MAX_SCORE,
+        "week_ago": datetime.datetime.utcnow() - datetime.timedelta(days=7),
+    }).mappings().all()
+
+    first = rows[0] if rows else {}
+    total = int(first.get("total") or 0)
+    bullish = int(first.get("bullish") or 0)
+    bearish = int(first.get("bearish") or 0)
+    avg_score = first.get("avg_score")
+    recent = [
+        {
+            "id": row["id"],
+            "company_name": row["company_name"],
+            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            "sentiment_score": row["sentiment_score"],
+        }
+        for row in rows
+    ]
+    return {
+        "total_reports": total,
+        "reports_last_7d": int(first.get("last_7d") or 0),
+        "average_sentiment": round(float(avg_score), 1) if avg_score is not None else None,
+        "sentiment_mix": {"bullish": bullish, "bearish": bearish, "neutral": total - bullish - bearish},
+        "latest_score": recent[0]["sentiment_score"] if recent else None,
+        "recent_tickers": list(dict.fromkeys(item["company_name"] for item in recent)),
+        "recent_reports": recent,
+    }
+
+def get_summary(db: Session, user) -> Dict[str, Any]:
+    from app.services.gemini_resolver import is_admin_email, has_gemini_key, key_status_cache_key
+
+    # 1. One pipelined read: cached aggregates, today's usage counter and the key status
+    summary, used, key_status = CacheService.get_many([
+        summary_cache_key(user.id),
+        CacheService.daily_usage_key(user.id),
+        key_status_cache_key(user),
+    ])
+
+    # 2. Aggregates from the database on a miss
+    if summary is None:
+        summary = _aggregate(db, user.id)
+        CacheService.set(summary_cache_key(user.id), summary, expire_seconds=SUMMARY_TTL_SECONDS)
+
+    # 3. Quota and key status are never served from the summary cache
+    used = int(used or 0)
+    unlimited = is_admin_email(user.email)
+    return {
+        **summary,
+        "quota": {
+            "limit": None if unlimited else DAILY_REPORT_LIMIT,
+            "used": used,
+            "remaining": None if unlimited else max(0, DAILY_REPORT_LIMIT - used),
+        },
+        "has_key": has_gemini_key(user, cached=key_status),
+    }
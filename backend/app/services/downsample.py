@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Optional
+
+def lttb_indices(prices, max_points: int):
+    """
+    Largest-Triangle-Three-Buckets: picks `max_points` indices that preserve the
+    visual shape (peaks and troughs) of the series. First and last points are always kept.
+    """
+    import numpy as np
+
+    y = np.asarray(prices, dtype=float)
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.floor(np.linspace(1, n - 1, max_points - 1)).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Triangle area between the previously selected point, each candidate and the next average
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+    return selected
+
+def downsample_history(history: List[Dict[str, Any]], max_points: Optional[int]) -> List[Dict[str, Any]]:
+    if not max_points or len(history) <= max_points:
+        return history
+    indices = lttb_indices([point["price"] for point in history], max_points)
+    return [history[i] for i in indices]
+
+def downsample_chart(chart_data: Optional[Dict[str, Any]], max_points: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Returns a copy of chart_data with at most `max_points` history points."""
+    if not chart_data or not max_points:
+        return chart_data
+    history = chart_data.get("history") or []
+    if len(history) <= max_points:
+        return chart_data
+    downsampled = chart_data.copy()
+    downsampled["history"] = downsample_history(history, max_points)
+    downsampled["original_points"] = len(history)
+    return downsampled
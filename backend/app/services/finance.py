@@ -1,7 +1,25 @@
-import os
-import requests
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from app.services.cache import CacheService
+from app.services.market_data import fetch_alpaca_bars, fetch_yfinance_closes, fetch_alpaca_latest, fetch_yfinance_latest
+from app.services.resilience import call_provider, hedged, ProviderUnavailable
+
+# Seconds to wait on Alpaca before racing yfinance against it
+MARKET_DATA_HEDGE_AFTER = 3.0
+
+# Display currencies offered in settings, plus the listing currencies infer_base_currency returns
+SUPPORTED_CURRENCIES = {"USD", "EUR", "GBP", "INR", "JPY", "CAD"}
+
+def infer_base_currency(symbol: str) -> str:
+    """Listing currency implied by the exchange suffix (US listings have none)."""
+    symbol = symbol.upper()
+    if symbol.endswith(".NS") or symbol.endswith(".BO"):
+        return "INR"
+    elif symbol.endswith(".L"):
+        return "GBP"
+    elif symbol.endswith(".TO"):
+        return "CAD"
+    return "USD"
 
 def get_conversion_rate(base: str, target: str) -> float:
     if base == target: return 1.0
@@ -14,7 +32,7 @@ def get_conversion_rate(base: str, target: str) -> float:
     try:
         import yfinance as yf
         pair = f"{base}{target}=X"
-        hist = yf.Ticker(pair).history(period="1d")
+        hist = call_provider("yfinance", lambda: yf.Ticker(pair).history(period="1d"), is_good=lambda h: not h.empty)
         if not hist.empty:
             rate = float(hist['Close'].iloc[-1])
             # Cache the rate for 24 hours (86400 seconds) to avoid API limits
@@ -51,109 +69,97 @@ def convert_chart_data(chart_data: dict, target_currency: str) -> dict:
     
     return new_chart_data
 
-def get_stock_history(query: str, target_currency: str = "USD", timeframe: str = "3M"):
+def get_histories(symbols: List[str], target_currency: str = "USD", timeframe: str = "3M") -> Dict[str, dict]:
     """
-    Attempts to find a ticker from the query and returns 3mo daily data from Alpaca/Yfinance,
-    converting to the target_currency.
+    Bulk version of get_stock_history: daily history for many tickers in target_currency,
+    fetched with one batched request per provider. Symbols without data are left out.
     """
-    try:
-        ticker_symbol = query.upper().strip()
-        data = []
-        base_currency = "USD"
-        
-        # 1. Global Market Fallback (yfinance)
-        if "." in ticker_symbol:
-            import yfinance as yf
-            ticker = yf.Ticker(ticker_symbol)
-            # Map frontend timeframe to yfinance period
-            yf_period = {"1M": "1mo", "3M": "3mo", "1Y": "1y", "5Y": "5y"}.get(timeframe, "3mo")
-            hist = ticker.history(period=yf_period)
-            
-            if hist.empty:
-                print(f"yfinance found no data for {ticker_symbol}")
-                return None
-                
-            data = []
-            for date, row in hist.iterrows():
-                data.append({
-                    "date": date.strftime('%Y-%m-%d'),
-                    "price": round(row['Close'], 2)
-                })
-                
-            if ticker_symbol.endswith(".NS") or ticker_symbol.endswith(".BO"):
-                base_currency = "INR"
-            elif ticker_symbol.endswith(".L"):
-                base_currency = "GBP"
-            elif ticker_symbol.endswith(".TO"):
-                base_currency = "CAD"
-            
-            # Data populated via yfinance
-
-        else:
-            # 2. US Market Default (Alpaca)
-            api_key = os.getenv("ALPACA_API_KEY")
-            secret_key = os.getenv("ALPACA_SECRET_KEY")
-            
-            if not api_key or not secret_key:
-                print("Alpaca keys missing, returning None")
-                return None
-
-            headers = {
-                "APCA-API-KEY-ID": api_key,
-                "APCA-API-SECRET-KEY": secret_key,
-                "Accept": "application/json"
-            }
-
-            days_map = {"1M": 30, "3M": 90, "1Y": 365, "5Y": 1825}
-            days = days_map.get(timeframe, 90)
-
-            end_dt = datetime.utcnow()
-            start_dt = end_dt - timedelta(days=days)
-            
-            start_str = start_dt.strftime('%Y-%m-%dT00:00:00Z')
-            end_str = end_dt.strftime('%Y-%m-%dT23:59:59Z')
-
-            url = f"https://data.alpaca.markets/v2/stocks/{ticker_symbol}/bars"
-            params = {
-                "timeframe": "1Day",
-                "start": start_str,
-                "end": end_str,
-                "limit": 10000,
-                "adjustment": "split",
-                "feed": "iex"
-            }
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s and s.strip()))
+    # Exchange-suffixed tickers are global listings (yfinance); bare tickers are US (Alpaca)
+    global_symbols = [s for s in symbols if "." in s]
+    us_symbols = [s for s in symbols if "." not in s]
 
-            res = requests.get(url, headers=headers, params=params)
-            if res.status_code != 200:
-                print("Alpaca Error:", res.text)
-                return None
-                
-            json_data = res.json()
-            bars = json_data.get("bars", [])
-            
-            if not bars:
-                return None
+    fetches = []
+    if us_symbols:
+        # yfinance also lists US tickers, so it is hedged against a slow or failing Alpaca
+        fetches.append(lambda: hedged(
+            ("alpaca", lambda: fetch_alpaca_bars(us_symbols, timeframe)),
+            ("yfinance", lambda: fetch_yfinance_closes(us_symbols, timeframe)),
+            hedge_after=MARKET_DATA_HEDGE_AFTER
+        ))
+    if global_symbols:
+        fetches.append(lambda: call_provider("yfinance", lambda: fetch_yfinance_closes(global_symbols, timeframe)))
 
-            for bar in bars:
-                # Alpaca timestamp looks like 2024-01-02T05:00:00Z
-                bar_date = datetime.strptime(bar['t'][:10], '%Y-%m-%d').strftime('%Y-%m-%d')
-                data.append({
-                    "date": bar_date,
-                    "price": round(bar['c'], 2)
-                })
+    raw: Dict[str, List[dict]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(fetches))) as pool:
+        futures = [pool.submit(fetch) for fetch in fetches]
+        for future in futures:
+            try:
+                raw.update(future.result())
+            except ProviderUnavailable as e:
+                print(f"Error fetching stock data: {e}")
 
-        # 3. Apply Multiplier
-        rate = get_conversion_rate(base_currency, target_currency)
+    # One FX lookup per listing currency, applied to every symbol in it
+    rates = {}
+    histories = {}
+    for symbol in symbols:
+        data = raw.get(symbol)
+        if not data:
+            continue
+        base_currency = infer_base_currency(symbol)
+        if base_currency not in rates:
+            rates[base_currency] = get_conversion_rate(base_currency, target_currency)
+        rate = rates[base_currency]
         if rate != 1.0:
-            for item in data:
-                item["price"] = round(item["price"] * rate, 2)
-                
-        return {
-            "symbol": ticker_symbol,
+            data = [{"date": item["date"], "price": round(item["price"] * rate, 2)} for item in data]
+        histories[symbol] = {
+            "symbol": symbol,
             "currency": target_currency,
             "history": data
         }
+    return histories
 
+def get_latest_prices(symbols: List[str]) -> Dict[str, dict]:
+    """
+    Latest price for many tickers in their listing currency, {"price", "currency", "time"},
+    with the same provider split and hedging as get_histories. Symbols without data are left out.
+    """
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s and s.strip()))
+    global_symbols = [s for s in symbols if "." in s]
+    us_symbols = [s for s in symbols if "." not in s]
+
+    fetches = []
+    if us_symbols:
+        fetches.append(lambda: hedged(
+            ("alpaca", lambda: fetch_alpaca_latest(us_symbols)),
+            ("yfinance", lambda: fetch_yfinance_latest(us_symbols)),
+            hedge_after=MARKET_DATA_HEDGE_AFTER
+        ))
+    if global_symbols:
+        fetches.append(lambda: call_provider("yfinance", lambda: fetch_yfinance_latest(global_symbols)))
+
+    latest: Dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(fetches))) as pool:
+        futures = [pool.submit(fetch) for fetch in fetches]
+        for future in futures:
+            try:
+                latest.update(future.result())
+            except ProviderUnavailable as e:
+                print(f"Error fetching latest prices: {e}")
+
+    return {
+        symbol: {**latest[symbol], "currency": infer_base_currency(symbol)}
+        for symbol in symbols if symbol in latest
+    }
+
+def get_stock_history(query: str, target_currency: str = "USD", timeframe: str = "3M"):
+    """
+    Attempts to find a ticker from the query and returns daily data for the timeframe from
+    Alpaca/Yfinance, converting to the target_currency.
+    """
+    try:
+        ticker_symbol = query.upper().strip()
+        return get_histories([ticker_symbol], target_currency, timeframe).get(ticker_symbol)
     except Exception as e:
-        print(f"Error fetching stock data from Alpaca: {e}")
-        return None
\ No newline at end of file
+        print(f"Error fetching stock data: {e}")
+        return None
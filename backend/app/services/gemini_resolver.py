@@ -42,3 +42,24 @@ def resolve_gemini_key(user: User) -> Optional[str]:
     except Exception as e:
         print(f"Error decrypting key: {e}")
         return None
+
+# Whether a user has a usable key, cached so status checks skip the Supabase round trip
+KEY_STATUS_TTL_SECONDS = 300
+
+def key_status_cache_key(user: User) -> str:
+    return f"gemini_key_status:{getattr(user, 'supabase_uid', None) or user.id}"
+
+def has_gemini_key(user: User, cached: Optional[dict] = None) -> bool:
+    """`cached` lets callers that already fetched the status key (e.g. in a pipeline) skip the lookup."""
+    from app.services.cache import CacheService
+    if cached is None:
+        cached = CacheService.get(key_status_cache_key(user))
+    if cached is not None:
+        return cached["hasKey"]
+    has_key = resolve_gemini_key(user) is not None
+    CacheService.set(key_status_cache_key(user), {"hasKey": has_key}, expire_seconds=KEY_STATUS_TTL_SECONDS)
+    return has_key
+
+def invalidate_key_status(user: User):
+    from app.services.cache import CacheService
+    CacheService.delete(key_status_cache_key(user))
@@ -0,0 +1,30 @@
+import json
+import hashlib
+from typing import Any, Optional
+from fastapi import Response
+
+# Conditional GET helpers: strong ETags over whatever identifies a response body,
+# and RFC 9110 If-None-Match matching (weak comparison, "*" and comma-separated lists).
+
+REPORT_CACHE_CONTROL = "private, no-cache"
+CHART_CACHE_CONTROL = "private, max-age=60"
+
+def make_etag(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Bodyless 304; returned directly so FastAPI skips response_model serialization."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def set_cache_headers(response: Response, etag: str, cache_control: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional
+from app.services.cache import CacheService
+
+SMA_WINDOWS = (20, 50, 200)
+EMA_SPANS = (12, 26)
+RSI_PERIOD = 14
+TRADING_DAYS = 252
+RETURN_WINDOWS = {"1W": 5, "1M": 21, "3M": 63, "6M": 126, "1Y": 252}
+
+def _ewm(values, alpha: float):
+    """
+    Exponentially weighted mean (y[0] = x[0], y[t] = (1 - alpha) * y[t-1] + alpha * x[t]).
+    Uses the closed form in chunks short enough that the (1 - alpha) ** -k weights stay finite.
+    """
+    import numpy as np
+
+    x = np.asarray(values, dtype=float)
+    out = np.empty_like(x)
+    if not len(x):
+        return out
+    decay = 1.0 - alpha
+    chunk = max(1, int(300 / -np.log(decay)))
+    prev = x[0]
+    for start in range(0, len(x), chunk):
+        block = x[start:start + chunk]
+        powers = decay ** np.arange(1, len(block) + 1)
+        out[start:start + len(block)] = powers * (prev + alpha * np.cumsum(block / powers))
+        prev = out[start + len(block) - 1]
+    return out
+
+def _round(value, digits: int = 2) -> Optional[float]:
+    import math
+    if value is None or math.isnan(value):
+        return None
+    return round(float(value), digits)
+
+def compute_indicators(prices: List[float]) -> Dict[str, Any]:
+    """Latest values of the standard indicator set, computed in bulk over a daily close series."""
+    import numpy as np
+
+    p = np.asarray(prices, dtype=float)
+    n = len(p)
+    if n < 2:
+        return {"bars": n}
+
+    log_returns = np.diff(np.log(p))
+    running_max = np.maximum.accumulate(p)
+    drawdown = p / running_max - 1.0
+    year = p[-TRADING_DAYS:]
+
+    result: Dict[str, Any] = {
+        "bars": n,
+        "last_close": _round(p[-1]),
+        "sma": {str(w): _round(p[-w:].mean()) for w in SMA_WINDOWS if n >= w},
+        "ema": {str(span): _round(_ewm(p, 2.0 / (span + 1))[-1]) for span in EMA_SPANS},
+        "volatility_20d_pct": _round(log_returns[-20:].std(ddof=1) * np.sqrt(TRADING_DAYS) * 100) if n > 20 else None,
+        "volatility_pct": _round(log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS) * 100) if n > 2 else None,
+        "max_drawdown_pct": _round(drawdown.min() * 100),
+        "drawdown_pct": _round(drawdown[-1] * 100),
+        "high_52w": _round(year.max()),
+        "low_52w": _round(year.min()),
+        "pct_from_52w_high": _round((p[-1] / year.max() - 1.0) * 100),
+        "returns_pct": {label: _round((p[-1] / p[-1 - w] - 1.0) * 100) for label, w in RETURN_WINDOWS.items() if n > w},
+    }
+    result["ema"]["macd"] = _round(result["ema"]["12"] - result["ema"]["26"])
+
+    # RSI with Wilder smoothing (alpha = 1 / period)
+    if n > RSI_PERIOD:
+        deltas = np.diff(p)
+        avg_gain = _ewm(np.clip(deltas, 0, None), 1.0 / RSI_PERIOD)[-1]
+        avg_loss = _ewm(np.clip(-deltas, 0, None), 1.0 / RSI_PERIOD)[-1]
+        result["rsi_14"] = 100.0 if avg_loss == 0 else _round(100 - 100 / (1 + avg_gain / avg_loss))
+    else:
+        result["rsi_14"] = None
+    return result
+
+def get_indicators(chart_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Indicators for a chart_data payload, cached per (symbol, currency, window, last bar)."""
+    if not chart_data or not chart_data.get("history"):
+        return None
+    history = chart_data["history"]
+    cache_key = f"indicators:{chart_data.get('symbol')}:{chart_data.get('currency')}:{len(history)}:{history[-1]['date']}"
+    cached = CacheService.get(cache_key)
+    if cached:
+        return cached
+    indicators = compute_indicators([point["price"] for point in history])
+    indicators["as_of"] = history[-1]["date"]
+    CacheService.set(cache_key, indicators, expire_seconds=86400)
+    return indicators
+
+def summarize_for_agent(indicators: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact technicals block for the LLM (keeps tool output small)."""
+    sma = indicators.get("sma", {})
+    last = indicators.get("last_close")
+    summary = {
+        "as_of": indicators.get("as_of"),
+        "rsi_14": indicators.get("rsi_14"),
+        "macd": indicators.get("ema", {}).get("macd"),
+        "sma_50": sma.get("50"),
+        "sma_200": sma.get("200"),
+        "volatility_20d_pct": indicators.get("volatility_20d_pct"),
+        "max_drawdown_pct": indicators.get("max_drawdown_pct"),
+        "high_52w": indicators.get("high_52w"),
+        "low_52w": indicators.get("low_52w"),
+        "pct_from_52w_high": indicators.get("pct_from_52w_high"),
+        "returns_pct": indicators.get("returns_pct"),
+    }
+    if last is not None and sma.get("200"):
+        summary["trend"] = "above 200d SMA" if last > sma["200"] else "below 200d SMA"
+    return {k: v for k, v in summary.items() if v is not None}
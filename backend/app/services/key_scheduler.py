@@ -0,0 +1,191 @@
+import os
+import math
+import re
+import time
+import random
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+from app.services.metrics import Counter, Histogram
+
+# Paces Gemini calls per user key (BYOK) so one analysis' tool loop cannot trip the key's limits:
+# a request bucket (RPM) and a token bucket (TPM) per key, transient 429s retried with backoff,
+# and error classification so only genuine auth failures revoke a stored key.
+# Buckets are per worker process; a 429 that still gets through is retried, not treated as fatal.
+
+GEMINI_RPM = float(os.getenv("GEMINI_KEY_RPM", "10"))
+GEMINI_TPM = float(os.getenv("GEMINI_KEY_TPM", "250000"))
+# Longest a call may wait for its key's budget before the request fails with 429
+MAX_WAIT_SECONDS = float(os.getenv("GEMINI_KEY_MAX_WAIT_SECONDS", "30"))
+MAX_RETRIES = int(os.getenv("GEMINI_KEY_MAX_RETRIES", "3"))
+OUTPUT_TOKEN_ALLOWANCE = 2048
+CHARS_PER_TOKEN = 4
+
+KEY_WAIT_SECONDS = Histogram(
+    "signalforge_gemini_key_wait_seconds",
+    "Time LLM calls were paced by the per-key scheduler.",
+    ("caller",),
+)
+KEY_RATE_LIMITS = Counter(
+    "signalforge_gemini_key_rate_limits_total",
+    "Gemini 429s by handling (retried, gave_up) and calls refused locally (throttled).",
+    ("caller", "result"),
+)
+
+_AUTH_MARKERS = ("api key not valid", "api_key_invalid", "invalid api key", "permission_denied", "unauthenticated", "401", "403")
+_RATE_MARKERS = ("429", "resource_exhausted", "resource has been exhausted", "rate limit", "quota")
+
+class KeyRateLimited(Exception):
+    """The key is over its rate limits for longer than callers are willing to wait."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Gemini rate limit reached for this key; retry in {math.ceil(retry_after)}s")
+        self.retry_after = retry_after
+
+def is_auth_error(exc: BaseException) -> bool:
+    """The key itself is rejected (invalid, revoked, no permission)."""
+    if _status_code(exc) in (401, 403):
+        return True
+    message = str(exc).lower()
+    return any(marker in message for marker in _AUTH_MARKERS) and not is_rate_limit_error(exc)
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Transient: RPM/TPM or daily quota exhausted. The key is fine."""
+    if isinstance(exc, KeyRateLimited) or _status_code(exc) == 429:
+        return True
+    message = str(exc).lower()
+    return any(marker in message for marker in _RATE_MARKERS)
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        value = value() if callable(value) else value
+        if isinstance(value, int):
+            return value
+    return None
+
+def _retry_delay(exc: BaseException) -> Optional[float]:
+    # Gemini puts the server's hint in the message: "Please retry in 12.3s" / "retryDelay': '12s'"
+    match = re.search(r"retry in ([\d.]+)\s*s|retrydelay\W+(\d+(?:\.\d+)?)s", str(exc).lower())
+    if match:
+        return float(match.group(1) or match.group(2))
+    return None
+
+def key_id(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        # May go negative (reconciled usage above the estimate); later callers then wait longer
+        self.tokens -= amount
+
+class _KeyState:
+    def __init__(self):
+        self.requests = TokenBucket(GEMINI_RPM)
+        self.tokens = TokenBucket(GEMINI_TPM)
+        # Earliest time the server said this key may be used again (from a 429 retry hint)
+        self.blocked_until = 0.0
+        self.last_used = time.monotonic()
+
+class KeyScheduler:
+    def __init__(self):
+        self._keys: Dict[str, _KeyState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, api_key: str) -> _KeyState:
+        kid = key_id(api_key)
+        state = self._keys.get(kid)
+        if state is None:
+            if len(self._keys) > 1000:
+                self._prune()
+            state = self._keys[kid] = _KeyState()
+        return state
+
+    def _prune(self):
+        cutoff = time.monotonic() - 600
+        for kid in [k for k, s in self._keys.items() if s.last_used < cutoff]:
+            del self._keys[kid]
+
+    def acquire(self, api_key: str, estimated_tokens: float, caller: str = "llm"):
+        """Blocks until the key has budget for one request of `estimated_tokens`, then reserves it."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                state = self._state(api_key)
+                now = time.monotonic()
+                delay = max(
+                    state.requests.wait_time(1, now),
+                    state.tokens.wait_time(estimated_tokens, now),
+                    state.blocked_until - now,
+                )
+                if delay <= 0:
+                    state.requests.take(1)
+                    state.tokens.take(estimated_tokens)
+                    state.last_used = now
+                    KEY_WAIT_SECONDS.observe(waited, caller=caller)
+                    return
+            if waited + delay > MAX_WAIT_SECONDS:
+                KEY_RATE_LIMITS.inc(caller=caller, result="throttled")
+                raise KeyRateLimited(waited + delay)
+            time.sleep(delay)
+            waited += delay
+
+    def reconcile(self, api_key: str, estimated_tokens: float, actual_tokens: Optional[float]):
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self._state(api_key).tokens.take(actual_tokens - estimated_tokens)
+
+    def block(self, api_key: str, seconds: float):
+        with self._lock:
+            state = self._state(api_key)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + seconds)
+
+    def call(self, api_key: str, fn: Callable[[], Any], estimated_tokens: float, caller: str = "llm"):
+        """
+        Runs one LLM call under the key's budget. Rate-limit errors are retried with
+        exponential backoff (or the server's retry hint); anything else propagates.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            self.acquire(api_key, estimated_tokens, caller)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                if attempt == MAX_RETRIES:
+                    KEY_RATE_LIMITS.inc(caller=caller, result="gave_up")
+                    raise KeyRateLimited(_retry_delay(e) or 60.0) from e
+                delay = _retry_delay(e) or min(30.0, 2 ** attempt + random.uniform(0, 1))
+                print(f"⏳ Gemini 429 for key {key_id(api_key)[:8]} ({caller}), retrying in {delay:.1f}s")
+                KEY_RATE_LIMITS.inc(caller=caller, result="retried")
+                self.block(api_key, delay)
+                continue
+            usage = getattr(result, "usage_metadata", None) or {}
+            self.reconcile(api_key, estimated_tokens, usage.get("total_tokens"))
+            return result
+
+def estimate_tokens(messages: Any) -> float:
+    """~4 characters per token for the prompt, plus room for the answer."""
+    if isinstance(messages, str):
+        chars = len(messages)
+    else:
+        chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return chars / CHARS_PER_TOKEN + OUTPUT_TOKEN_ALLOWANCE
+
+SCHEDULER = KeyScheduler()
@@ -0,0 +1,66 @@
+import threading
+from collections import deque
+from typing import Any, Dict, List
+from app.services.metrics import Counter, Histogram
+
+LLM_CALLS = Counter(
+    "signalforge_llm_calls_total",
+    "Gemini calls by graph node and outcome.",
+    ("node", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "signalforge_llm_tokens_total",
+    "Gemini tokens by graph node and direction (input/output).",
+    ("node", "direction"),
+)
+LLM_CALL_SECONDS = Histogram(
+    "signalforge_llm_call_seconds",
+    "Latency of individual Gemini calls by graph node.",
+    ("node",),
+)
+
+GROUPS = ("user", "ticker", "node")
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"calls": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0, "tool_calls": 0, "runs": 0, "max_iterations": 0}
+
+
+class LLMLedger:
+    """Process-wide aggregates of LLM usage per user, per ticker and per graph node."""
+
+    def __init__(self, max_runs: int = 500):
+        self._lock = threading.Lock()
+        self._groups: Dict[str, Dict[str, Dict[str, Any]]] = {group: {} for group in GROUPS}
+        self._runs = deque(maxlen=max_runs)
+
+    def record_run(self, run: Dict[str, Any]):
+        with self._lock:
+            self._runs.append(run)
+            for call in run["calls"]:
+                for group, key in (("user", run["user_id"]), ("ticker", run["ticker"]), ("node", call["node"])):
+                    stats = self._groups[group].setdefault(str(key), _empty_stats())
+                    stats["calls"] += 1
+                    stats["errors"] += 1 if call["error"] else 0
+                    stats["input_tokens"] += call["input_tokens"]
+                    stats["output_tokens"] += call["output_tokens"]
+                    stats["seconds"] += call["seconds"]
+            for group, key in (("user", run["user_id"]), ("ticker", run["ticker"])):
+                stats = self._groups[group].setdefault(str(key), _empty_stats())
+                stats["runs"] += 1
+                stats["tool_calls"] += run["tool_calls"]
+                stats["max_iterations"] = max(stats["max_iterations"], run["iterations"])
+
+    def summary(self, group: str, limit: int = 50, sort_by: str = "input_tokens") -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [{group: key, **stats} for key, stats in self._groups[group].items()]
+        rows.sort(key=lambda row: row.get(sort_by, 0), reverse=True)
+        return rows[:limit]
+
+    def recent_runs(self, limit: int = 50, min_iterations: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            runs = [run for run in self._runs if run["iterations"] >= min_iterations]
+        return [{k: v for k, v in run.items() if k != "calls"} for run in reversed(runs)][:limit]
+
+
+LEDGER = LLMLedger()
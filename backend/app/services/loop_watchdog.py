@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, Optional
+from app.services.metrics import Counter, Histogram
+from app.services.profiler import collapse_stack, short_path
+
+# Event-loop blocking detector. A heartbeat task on the loop measures how late it wakes up
+# (loop lag); a watchdog thread notices when the heartbeat stalls past BLOCK_THRESHOLD_SECONDS
+# and captures the loop thread's stack while the blocking call is still running, so the
+# offending call site (a sync Redis/DB/HTTP call inside an async path) is named directly.
+
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() in ("1", "true", "yes")
+HEARTBEAT_INTERVAL_SECONDS = 0.1
+BLOCK_THRESHOLD_SECONDS = float(os.getenv("LOOP_BLOCK_THRESHOLD_SECONDS", "0.25"))
+RECENT_BLOCKS = 50
+
+LOOP_LAG_SECONDS = Histogram(
+    "signalforge_event_loop_lag_seconds",
+    "How late the event loop ran a heartbeat scheduled every 100ms.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKS = Counter(
+    "signalforge_event_loop_blocks_total",
+    "Times the event loop was blocked past the threshold, by innermost app call site.",
+    ("site",),
+)
+LOOP_BLOCKED_SECONDS = Counter(
+    "signalforge_event_loop_blocked_seconds_total",
+    "Time the event loop spent blocked past the threshold, by innermost app call site.",
+    ("site",),
+)
+
+def _call_site(frame) -> Dict[str, str]:
+    """Innermost frame in app code (where the blocking call was made) and the innermost frame overall."""
+    innermost = frame
+    site = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if f"{os.sep}app{os.sep}" in filename and "site-packages" not in filename and not filename.endswith("loop_watchdog.py"):
+            code = frame.f_code
+            site = f"{short_path(code.co_filename)}:{frame.f_lineno} ({getattr(code, 'co_qualname', code.co_name)})"
+            break
+        frame = frame.f_back
+    inner = innermost.f_code
+    return {
+        "site": site or "outside app code",
+        "blocked_in": f"{short_path(inner.co_filename)}:{innermost.f_lineno} ({getattr(inner, 'co_qualname', inner.co_name)})",
+    }
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = BLOCK_THRESHOLD_SECONDS, interval: float = HEARTBEAT_INTERVAL_SECONDS):
+        self.threshold = threshold
+        self.interval = interval
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        # Block captured by the watchdog thread, completed by the heartbeat once the loop runs again
+        self._pending: Optional[dict] = None
+        self._recent = deque(maxlen=RECENT_BLOCKS)
+        self._max_lag = 0.0
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"✅ Event-loop watchdog started (block threshold {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+
+    async def _beat(self):
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - scheduled - self.interval)
+            self._last_beat = now
+            LOOP_LAG_SECONDS.observe(lag)
+            self._max_lag = max(self._max_lag, lag)
+
+            with self._lock:
+                block, self._pending = self._pending, None
+            if block is not None:
+                # The stall started at the previous beat; the whole of it is the blocked time
+                block["blocked_seconds"] = round(now - block["last_beat"] - self.interval, 3)
+                del block["last_beat"]
+                LOOP_BLOCKS.inc(site=block["site"])
+                LOOP_BLOCKED_SECONDS.inc(block["blocked_seconds"], site=block["site"])
+                print(f"🧱 Event loop blocked {block['blocked_seconds'] * 1000:.0f}ms at {block['site']} (in {block['blocked_in']})")
+                with self._lock:
+                    self._recent.appendleft(block)
+
+    def _watch(self):
+        while not self._stopped.wait(self.threshold / 4):
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat - self.interval
+            if stalled < self.threshold:
+                continue
+            with self._lock:
+                # One capture per stall
+                if self._pending is not None and self._pending["last_beat"] == last_beat:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            block = {
+                "at": time.time(),
+                "last_beat": last_beat,
+                **_call_site(frame),
+                "stack": ";".join(collapse_stack(frame)),
+            }
+            del frame
+            with self._lock:
+                # The loop may have recovered while the stack was captured; that stack is not the stall
+                if self._last_beat == last_beat:
+                    self._pending = block
+
+    def report(self, limit: int = 20) -> dict:
+        """Recent blocks with their stacks, and per-site totals over those blocks."""
+        with self._lock:
+            recent = list(self._recent)
+        sites: Dict[str, dict] = {}
+        for block in recent:
+            entry = sites.setdefault(block["site"], {"site": block["site"], "blocks": 0, "blocked_seconds": 0.0})
+            entry["blocks"] += 1
+            entry["blocked_seconds"] = round(entry["blocked_seconds"] + block["blocked_seconds"], 3)
+        return {
+            "threshold_seconds": self.threshold,
+            "max_lag_seconds": round(self._max_lag, 4),
+            "sites": sorted(sites.values(), key=lambda s: s["blocked_seconds"], reverse=True),
+            "recent": recent[:limit],
+        }
+
+WATCHDOG = LoopWatchdog()
+
+def start_loop_watchdog():
+    if LOOP_WATCHDOG_ENABLED:
+        WATCHDOG.start()
+
+async def stop_loop_watchdog():
+    await WATCHDOG.stop()
@@ -0,0 +1,148 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Raw daily closes from the market-data providers, fetched in batches:
+# Alpaca's multi-symbol bars endpoint for US tickers and a grouped yf.download for global ones.
+# Values are lists of {"date": "YYYY-MM-DD", "price": float} in the listing currency.
+
+ALPACA_BARS_URL = "https://data.alpaca.markets/v2/stocks/bars"
+ALPACA_PAGE_LIMIT = 10000
+ALPACA_SYMBOLS_PER_REQUEST = 100
+# (connect, read) seconds per page request
+ALPACA_REQUEST_TIMEOUT = (3.05, 8)
+
+TIMEFRAME_DAYS = {"1M": 30, "3M": 90, "1Y": 365, "5Y": 1825, "13M": 395}
+# "13M" is internal: a year of returns needs 253 closes, more than 365 calendar days hold
+YF_PERIODS = {"1M": "1mo", "3M": "3mo", "1Y": "1y", "5Y": "5y", "13M": "2y"}
+
+def _alpaca_headers():
+    api_key = os.getenv("ALPACA_API_KEY")
+    secret_key = os.getenv("ALPACA_SECRET_KEY")
+    if not api_key or not secret_key:
+        return None
+    return {
+        "APCA-API-KEY-ID": api_key,
+        "APCA-API-SECRET-KEY": secret_key,
+        "Accept": "application/json"
+    }
+
+def fetch_alpaca_bars(symbols: List[str], timeframe: str = "3M") -> Dict[str, List[dict]]:
+    """
+    Daily bars for many US symbols. The `limit` applies to the whole page (all symbols
+    together), so every batch follows `next_page_token` until Alpaca stops returning one.
+    """
+    import requests
+
+    headers = _alpaca_headers()
+    if not headers:
+        print("Alpaca keys missing, returning no bars")
+        return {}
+
+    end_dt = datetime.utcnow()
+    start_dt = end_dt - timedelta(days=TIMEFRAME_DAYS.get(timeframe, 90))
+    bars_by_symbol: Dict[str, List[dict]] = {}
+
+    for i in range(0, len(symbols), ALPACA_SYMBOLS_PER_REQUEST):
+        params = {
+            "symbols": ",".join(symbols[i:i + ALPACA_SYMBOLS_PER_REQUEST]),
+            "timeframe": "1Day",
+            "start": start_dt.strftime('%Y-%m-%dT00:00:00Z'),
+            "end": end_dt.strftime('%Y-%m-%dT23:59:59Z'),
+            "limit": ALPACA_PAGE_LIMIT,
+            "adjustment": "split",
+            "feed": "iex"
+        }
+        while True:
+            res = requests.get(ALPACA_BARS_URL, headers=headers, params=params, timeout=ALPACA_REQUEST_TIMEOUT)
+            if res.status_code != 200:
+                # Raised so the resilience layer counts it against Alpaca and falls back
+                print("Alpaca Error:", res.text)
+                raise RuntimeError(f"Alpaca bars request failed with HTTP {res.status_code}")
+
+            json_data = res.json()
+            for symbol, bars in (json_data.get("bars") or {}).items():
+                # Alpaca timestamp looks like 2024-01-02T05:00:00Z
+                bars_by_symbol.setdefault(symbol, []).extend(
+                    {"date": bar["t"][:10], "price": round(bar["c"], 2)} for bar in bars
+                )
+
+            page_token = json_data.get("next_page_token")
+            if not page_token:
+                break
+            params["page_token"] = page_token
+
+    return bars_by_symbol
+
+def fetch_yfinance_closes(symbols: List[str], timeframe: str = "3M") -> Dict[str, List[dict]]:
+    """Daily closes for many symbols with one grouped yf.download call."""
+    import yfinance as yf
+
+    data = yf.download(
+        symbols,
+        period=YF_PERIODS.get(timeframe, "3mo"),
+        interval="1d",
+        auto_adjust=True,
+        progress=False,
+        threads=True
+    )
+    if data is None or data.empty:
+        print(f"yfinance found no data for {', '.join(symbols)}")
+        return {}
+
+    closes = data["Close"]
+    if closes.ndim == 1:
+        closes = closes.to_frame(symbols[0])
+
+    dates = closes.index.strftime('%Y-%m-%d')
+    closes_by_symbol: Dict[str, List[dict]] = {}
+    for symbol in closes.columns:
+        column = closes[symbol].round(2)
+        mask = column.notna().to_numpy()
+        if mask.any():
+            closes_by_symbol[symbol] = [
+                {"date": date, "price": float(price)}
+                for date, price in zip(dates[mask], column.to_numpy()[mask])
+            ]
+    return closes_by_symbol
+
+ALPACA_LATEST_TRADES_URL = "https://data.alpaca.markets/v2/stocks/trades/latest"
+
+def fetch_alpaca_latest(symbols: List[str]) -> Dict[str, dict]:
+    """Latest trade price for many US symbols, {"price": float, "time": iso8601}."""
+    import requests
+
+    headers = _alpaca_headers()
+    if not headers:
+        print("Alpaca keys missing, returning no prices")
+        return {}
+
+    latest: Dict[str, dict] = {}
+    for i in range(0, len(symbols), ALPACA_SYMBOLS_PER_REQUEST):
+        params = {"symbols": ",".join(symbols[i:i + ALPACA_SYMBOLS_PER_REQUEST]), "feed": "iex"}
+        res = requests.get(ALPACA_LATEST_TRADES_URL, headers=headers, params=params, timeout=ALPACA_REQUEST_TIMEOUT)
+        if res.status_code != 200:
+            print("Alpaca Error:", res.text)
+            raise RuntimeError(f"Alpaca latest trades request failed with HTTP {res.status_code}")
+        for symbol, trade in (res.json().get("trades") or {}).items():
+            latest[symbol] = {"price": round(trade["p"], 2), "time": trade["t"]}
+    return latest
+
+def fetch_yfinance_latest(symbols: List[str]) -> Dict[str, dict]:
+    """Most recent one-minute close for many symbols with one grouped yf.download call."""
+    import yfinance as yf
+
+    data = yf.download(symbols, period="1d", interval="1m", auto_adjust=True, progress=False, threads=True)
+    if data is None or data.empty:
+        return {}
+
+    closes = data["Close"]
+    if closes.ndim == 1:
+        closes = closes.to_frame(symbols[0])
+
+    latest: Dict[str, dict] = {}
+    for symbol in closes.columns:
+        column = closes[symbol].dropna()
+        if not column.empty:
+            latest[symbol] = {"price": round(float(column.iloc[-1]), 2), "time": column.index[-1].isoformat()}
+    return latest
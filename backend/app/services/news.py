@@ -0,0 +1,174 @@
+import os
+import re
+import math
+import datetime
+from typing import Dict, List, Optional, Set
+from app.services.metrics import Counter, Histogram
+
+# Turns raw search results into a compact digest for the agent: near-duplicate (syndicated)
+# articles are dropped by shingle-hash Jaccard similarity, the rest ranked by relevance and
+# recency, and the digest trimmed to a token budget instead of pasting every snippet verbatim.
+
+NEWS_MAX_RESULTS = int(os.getenv("NEWS_MAX_RESULTS", "8"))
+NEWS_TOKEN_BUDGET = int(os.getenv("NEWS_TOKEN_BUDGET", "900"))
+# Word n-gram size for shingles, and the Jaccard similarity above which two snippets are the same story
+SHINGLE_SIZE = 4
+DUPLICATE_THRESHOLD = 0.5
+RECENCY_HALF_LIFE_DAYS = 7.0
+CHARS_PER_TOKEN = 4
+# Below this many tokens a truncated snippet is not worth including
+MIN_ITEM_TOKENS = 40
+
+NEWS_ITEMS = Counter(
+    "signalforge_news_items_total",
+    "News results by fate in the digest (kept, duplicate, over_budget).",
+    ("result",),
+)
+NEWS_DIGEST_TOKENS = Histogram(
+    "signalforge_news_digest_tokens",
+    "Estimated tokens of news handed to the agent, before (raw) and after (digest) processing.",
+    ("stage",),
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+
+try:
+    import xxhash
+
+    def _hash(text: str) -> int:
+        return xxhash.xxh64_intdigest(text.encode("utf-8"))
+except ImportError:
+    import hashlib
+
+    def _hash(text: str) -> int:
+        return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed word n-grams; a snippet shorter than `size` words is one shingle."""
+    words = _words(text)
+    if len(words) <= size:
+        return {_hash(" ".join(words))} if words else set()
+    return {_hash(" ".join(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def _estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _parse_date(value) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+def normalize_results(results, provider: str) -> List[Dict]:
+    """Tavily / DuckDuckGo results (a list of dicts, or a plain text blob) as uniform items."""
+    if isinstance(results, str):
+        return [{"title": "", "url": "", "content": results, "published": None, "score": None}] if results.strip() else []
+
+    items = []
+    for r in results or []:
+        if not isinstance(r, dict):
+            continue
+        content = (r.get("content") or r.get("snippet") or r.get("body") or "").strip()
+        if not content:
+            continue
+        items.append({
+            "title": (r.get("title") or "").strip(),
+            "url": r.get("url") or r.get("link") or "",
+            "content": content,
+            "published": _parse_date(r.get("published_date") or r.get("date")),
+            "score": r.get("score") if provider == "tavily" else None,
+        })
+    return items
+
+def _rank(item: Dict, query_words: Set[str], now: datetime.datetime) -> float:
+    # Relevance: the provider's score when it gives one, otherwise query-term coverage
+    if item["score"] is not None:
+        relevance = float(item["score"])
+    else:
+        words = set(_words(item["title"] + " " + item["content"]))
+        relevance = len(query_words & words) / len(query_words) if query_words else 0.5
+
+    # Recency: halves every RECENCY_HALF_LIFE_DAYS; undated items count as middling
+    if item["published"] is not None:
+        age_days = max(0.0, (now - item["published"]).total_seconds() / 86400)
+        recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    else:
+        recency = 0.5
+    return relevance * (0.5 + 0.5 * recency)
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # Prefer ending on a sentence, then on a word
+    boundary = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if boundary > max_chars // 2:
+        return cut[:boundary + 1]
+    return cut.rsplit(" ", 1)[0] + " …"
+
+def _format(item: Dict, content: str) -> str:
+    meta = [m for m in (item["url"], item["published"].date().isoformat() if item["published"] else "") if m]
+    header = item["title"] or "Untitled"
+    if meta:
+        header += f" ({', '.join(meta)})"
+    return f"- {header}\n  {content}"
+
+def build_digest(query: str, items: List[Dict], token_budget: int = NEWS_TOKEN_BUDGET) -> str:
+    """Deduplicated, ranked news items as one text block within `token_budget` (estimated) tokens."""
+    if not items:
+        return "No recent news found."
+
+    NEWS_DIGEST_TOKENS.observe(sum(_estimate_tokens(i["content"]) for i in items), stage="raw")
+
+    # 1. Rank first, so the best copy of a duplicated story is the one kept
+    now = datetime.datetime.now(datetime.timezone.utc)
+    query_words = set(_words(query))
+    ranked = sorted(items, key=lambda i: _rank(i, query_words, now), reverse=True)
+
+    # 2. Drop near-duplicates (same URL, or shingle overlap above the threshold)
+    kept, kept_shingles, seen_urls = [], [], set()
+    for item in ranked:
+        item_shingles = shingles(item["content"])
+        if (item["url"] and item["url"] in seen_urls) or any(
+            jaccard(item_shingles, other) >= DUPLICATE_THRESHOLD for other in kept_shingles
+        ):
+            NEWS_ITEMS.inc(result="duplicate")
+            continue
+        kept.append(item)
+        kept_shingles.append(item_shingles)
+        if item["url"]:
+            seen_urls.add(item["url"])
+
+    # 3. Fill the budget in rank order, truncating the item that crosses it
+    sections, remaining = [], token_budget
+    for item in kept:
+        cost = _estimate_tokens(_format(item, item["content"]))
+        if cost <= remaining:
+            sections.append(_format(item, item["content"]))
+            remaining -= cost
+            NEWS_ITEMS.inc(result="kept")
+            continue
+        overhead = _estimate_tokens(_format(item, ""))
+        if remaining - overhead >= MIN_ITEM_TOKENS:
+            content = _truncate(item["content"], (remaining - overhead) * CHARS_PER_TOKEN)
+            sections.append(_format(item, content))
+            remaining -= _estimate_tokens(sections[-1])
+            NEWS_ITEMS.inc(result="kept")
+        else:
+            NEWS_ITEMS.inc(result="over_budget")
+
+    digest = "\n".join(sections)
+    NEWS_DIGEST_TOKENS.observe(_estimate_tokens(digest), stage="digest")
+    return digest
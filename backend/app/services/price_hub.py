@@ -0,0 +1,240 @@
+import os
+import re
+import time
+import asyncio
+from typing import Dict, Optional, Set, Tuple
+from fastapi import WebSocket, WebSocketDisconnect
+from app.services.metrics import Counter, Gauge, Histogram
+
+# Live prices over WebSocket. The hub polls each distinct subscribed symbol once per interval
+# (one batched upstream request, however many clients watch it), converts with FX rates held
+# in memory, and fans changes out through a bounded queue per client: a slow client loses its
+# oldest queued updates instead of stalling the poller or everyone else. State is per worker process.
+
+POLL_INTERVAL_SECONDS = float(os.getenv("PRICE_POLL_INTERVAL_SECONDS", "5"))
+FX_REFRESH_SECONDS = float(os.getenv("PRICE_FX_REFRESH_SECONDS", "900"))
+# A failed FX lookup is retried sooner; meanwhile prices go out in their listing currency
+FX_RETRY_SECONDS = 60.0
+CLIENT_QUEUE_SIZE = 64
+SEND_TIMEOUT_SECONDS = 10.0
+MAX_SYMBOLS_PER_CLIENT = 25
+
+_SYMBOL_RE = re.compile(r"^[A-Z0-9][A-Z0-9.\-]{0,14}$")
+
+PRICE_HUB_CLIENTS = Gauge(
+    "signalforge_price_hub_clients",
+    "Connected live-price WebSocket clients.",
+)
+PRICE_HUB_SYMBOLS = Gauge(
+    "signalforge_price_hub_symbols",
+    "Distinct symbols the price hub is polling.",
+)
+PRICE_HUB_POLL_SECONDS = Histogram(
+    "signalforge_price_hub_poll_seconds",
+    "Duration of one batched upstream price poll.",
+)
+PRICE_HUB_DROPPED = Counter(
+    "signalforge_price_hub_dropped_total",
+    "Price updates dropped for clients whose queue was full.",
+)
+
+class PriceClient:
+    def __init__(self, websocket: WebSocket, currency: str):
+        self.websocket = websocket
+        self.currency = currency
+        self.symbols: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+
+    def offer(self, message: dict):
+        """Never blocks the caller: when the queue is full the oldest update is dropped."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            PRICE_HUB_DROPPED.inc()
+        self.queue.put_nowait(message)
+
+    async def send_loop(self):
+        while True:
+            message = await self.queue.get()
+            await asyncio.wait_for(self.websocket.send_json(message), timeout=SEND_TIMEOUT_SECONDS)
+
+class PriceHub:
+    def __init__(self):
+        self._clients: Set[PriceClient] = set()
+        self._subscribers: Dict[str, Set[PriceClient]] = {}
+        # Last quote per symbol in its listing currency: {"price", "currency", "time"}
+        self._latest: Dict[str, dict] = {}
+        # (base, target) -> (rate, fetched_at); rate is None after a failed lookup
+        self._rates: Dict[Tuple[str, str], Tuple[Optional[float], float]] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    # --- Subscriptions ---
+
+    async def subscribe(self, client: PriceClient, symbols):
+        from app.services.finance import infer_base_currency
+
+        # Rates first, so no update can reach this client before its conversion is known
+        await self._ensure_rates({(infer_base_currency(symbol), client.currency) for symbol in symbols})
+
+        added = []
+        for symbol in symbols:
+            if len(client.symbols) >= MAX_SYMBOLS_PER_CLIENT:
+                client.offer({"type": "error", "detail": f"At most {MAX_SYMBOLS_PER_CLIENT} symbols per connection."})
+                break
+            if symbol in client.symbols:
+                continue
+            client.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(client)
+            added.append(symbol)
+        PRICE_HUB_SYMBOLS.set(len(self._subscribers))
+
+        # Late joiners get the last known price straight away
+        for symbol in added:
+            quote = self._latest.get(symbol)
+            if quote:
+                client.offer(self._message(symbol, quote, client.currency))
+
+        if self._subscribers and (self._poller is None or self._poller.done()):
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    def unsubscribe(self, client: PriceClient, symbols):
+        for symbol in symbols:
+            client.symbols.discard(symbol)
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(client)
+            if not subscribers:
+                del self._subscribers[symbol]
+                self._latest.pop(symbol, None)
+        PRICE_HUB_SYMBOLS.set(len(self._subscribers))
+
+    # --- Polling and fan-out ---
+
+    async def _poll_loop(self):
+        from app.services.finance import get_latest_prices
+
+        loop = asyncio.get_running_loop()
+        # Stops by itself once nobody is subscribed; the next subscribe restarts it
+        while self._subscribers:
+            started = time.perf_counter()
+            symbols = list(self._subscribers)
+            try:
+                quotes = await loop.run_in_executor(None, get_latest_prices, symbols)
+            except Exception as e:
+                print(f"⚠️ Price poll failed: {e}")
+                quotes = {}
+            PRICE_HUB_POLL_SECONDS.observe(time.perf_counter() - started)
+
+            changed = {}
+            for symbol, quote in quotes.items():
+                previous = self._latest.get(symbol)
+                if previous is None or previous["price"] != quote["price"] or previous["time"] != quote["time"]:
+                    changed[symbol] = quote
+
+            if changed:
+                await self._ensure_rates({
+                    (quote["currency"], client.currency)
+                    for symbol, quote in changed.items()
+                    for client in self._subscribers.get(symbol, ())
+                })
+                for symbol, quote in changed.items():
+                    subscribers = self._subscribers.get(symbol)
+                    if not subscribers:
+                        continue
+                    self._latest[symbol] = quote
+                    # One message per currency, shared by every subscriber that wants it
+                    messages = {}
+                    for client in subscribers:
+                        if client.currency not in messages:
+                            messages[client.currency] = self._message(symbol, quote, client.currency)
+                        client.offer(messages[client.currency])
+
+            await asyncio.sleep(max(0.0, POLL_INTERVAL_SECONDS - (time.perf_counter() - started)))
+
+    async def _ensure_rates(self, pairs):
+        from app.services.finance import get_conversion_rate
+
+        now = time.monotonic()
+
+        def is_stale(pair):
+            if pair not in self._rates:
+                return True
+            rate, fetched_at = self._rates[pair]
+            return now - fetched_at > (FX_REFRESH_SECONDS if rate is not None else FX_RETRY_SECONDS)
+
+        stale = [(base, target) for base, target in pairs if base != target and is_stale((base, target))]
+        if not stale:
+            return
+        loop = asyncio.get_running_loop()
+        rates = await asyncio.gather(*(loop.run_in_executor(None, get_conversion_rate, base, target) for base, target in stale))
+        for pair, rate in zip(stale, rates):
+            # get_conversion_rate answers 1.0 when the lookup fails; between two currencies that is no rate
+            self._rates[pair] = (None if rate == 1.0 else rate, now)
+
+    def _message(self, symbol: str, quote: dict, currency: str) -> dict:
+        base = quote["currency"]
+        rate = 1.0 if base == currency else self._rates.get((base, currency), (None, 0))[0]
+        if rate is None:
+            # No rate (not loaded, or the lookup failed): send the listing-currency price rather than nothing
+            rate, currency = 1.0, base
+        return {
+            "type": "price",
+            "symbol": symbol,
+            "price": round(quote["price"] * rate, 2),
+            "currency": currency,
+            "time": quote["time"],
+        }
+
+    # --- Connections ---
+
+    async def serve(self, websocket: WebSocket, currency: str):
+        """Runs one accepted connection until the client leaves or falls too far behind."""
+        client = PriceClient(websocket, currency)
+        self._clients.add(client)
+        PRICE_HUB_CLIENTS.set(len(self._clients))
+        sender = asyncio.create_task(client.send_loop())
+        receiver = asyncio.create_task(self._receive_loop(client))
+        try:
+            # Whichever ends first (disconnect, send timeout) ends the connection
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if isinstance(error, asyncio.TimeoutError):
+                    print("🐢 Closing a live-price client that stopped reading")
+                    await websocket.close(code=1013)
+        except Exception:
+            pass
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            self.unsubscribe(client, list(client.symbols))
+            self._clients.discard(client)
+            PRICE_HUB_CLIENTS.set(len(self._clients))
+
+    async def _receive_loop(self, client: PriceClient):
+        try:
+            while True:
+                data = await client.websocket.receive_json()
+                action = data.get("action") if isinstance(data, dict) else None
+                requested = data.get("symbols") if action else None
+                # A bare string would otherwise be iterated into one-letter tickers
+                if not isinstance(requested, list) or not all(isinstance(s, str) for s in requested):
+                    requested = None
+                symbols = [s.upper().strip() for s in requested or []]
+                invalid = [s for s in symbols if not _SYMBOL_RE.match(s)]
+                if action not in ("subscribe", "unsubscribe") or requested is None or invalid:
+                    client.offer({"type": "error", "detail": "Expected {\"action\": \"subscribe\"|\"unsubscribe\", \"symbols\": [...]} with valid tickers."})
+                    continue
+                if action == "subscribe":
+                    await self.subscribe(client, symbols)
+                else:
+                    self.unsubscribe(client, symbols)
+                client.offer({"type": "subscribed", "symbols": sorted(client.symbols), "currency": client.currency})
+        except (WebSocketDisconnect, ValueError, KeyError):
+            return
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+
+PRICE_HUB = PriceHub()
@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+import uuid
+import asyncio
+import threading
+from collections import Counter as Tally, deque
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+from app.services.metrics import Counter
+
+# On-demand sampling profiler. While a profiled request is in flight a background thread
+# samples every thread's Python stack (sys._current_frames) at a fixed interval, so the
+# profile shows event-loop work, executor threads (pandas, JSON, provider calls) and time
+# spent blocked in I/O side by side. Output is in the collapsed-stack format read by
+# flamegraph.pl, speedscope and similar tools. Profiles are kept in memory per worker.
+#
+# Triggers:
+# - an admin sends `X-Profile: 1` (or `?profile=1`): the whole request is sampled
+# - any request still running after PROFILE_SLOW_THRESHOLD_SECONDS: the rest of it is sampled
+
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.005"))
+# 0 disables slow-request profiling
+PROFILE_SLOW_THRESHOLD_SECONDS = float(os.getenv("PROFILE_SLOW_THRESHOLD_SECONDS", "20"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+MAX_STACK_DEPTH = 128
+
+PROFILES_CAPTURED = Counter(
+    "signalforge_profiles_captured_total",
+    "Request profiles captured, by trigger (requested, slow).",
+    ("trigger",),
+)
+
+def short_path(filename: str) -> str:
+    # Packages and app modules by import path; the standard library by file name
+    for marker in ("site-packages/", "/backend/"):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    return os.path.basename(filename)
+
+def collapse_stack(frame) -> List[str]:
+    """Outermost-first frame labels for one thread's stack."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        labels.append(f"{short_path(code.co_filename)}:{name}".replace(";", ":").replace(" ", "_"))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+def _is_idle_worker(frame) -> bool:
+    # Pool threads parked waiting for work would otherwise dominate every profile. A
+    # concurrent.futures worker blocks inside SimpleQueue.get (C code), so its innermost Python
+    # frame is `_worker` itself; anyio's workers wait in queue.py/threading.py below WorkerThread.run.
+    for _ in range(4):
+        if frame is None:
+            return False
+        code = frame.f_code
+        if code.co_name == "_worker" and code.co_filename.endswith("thread.py"):
+            return True
+        if getattr(code, "co_qualname", code.co_name) == "WorkerThread.run":
+            return True
+        if not code.co_filename.endswith(("queue.py", "threading.py")):
+            return False
+        frame = frame.f_back
+    return False
+
+class Profile:
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.duration_seconds: Optional[float] = None
+        self.samples: Tally = Tally()
+        self.sample_count = 0
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration_seconds,
+            "samples": self.sample_count,
+        }
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+class SamplingProfiler:
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS, keep: int = PROFILE_KEEP):
+        self.interval = interval
+        self._active: Dict[str, Profile] = {}
+        self._finished = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, method: str, path: str, trigger: str) -> Profile:
+        profile = Profile(method, path, trigger)
+        with self._lock:
+            self._active[profile.id] = profile
+            # One sampler thread serves every profile in flight
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: Profile):
+        with self._lock:
+            self._active.pop(profile.id, None)
+            profile.duration_seconds = round(time.time() - profile.started_at, 3)
+            self._finished.appendleft(profile)
+        PROFILES_CAPTURED.inc(trigger=profile.trigger)
+        print(f"🔥 Profiled {profile.method} {profile.path} ({profile.trigger}): {profile.sample_count} samples over {profile.duration_seconds}s -> {profile.id}")
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                profiles = list(self._active.values())
+
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            frame = None
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == me or _is_idle_worker(frame):
+                    continue
+                labels = collapse_stack(frame)
+                if labels:
+                    stacks.append(f"{names.get(ident, ident)};" + ";".join(labels))
+            # Frame references keep every sampled frame's locals alive
+            del frames, frame
+
+            with self._lock:
+                for profile in profiles:
+                    profile.samples.update(stacks)
+                    profile.sample_count += 1
+            time.sleep(self.interval)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [p.summary() for p in self._active.values()] + [p.summary() for p in self._finished]
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return self._active.get(profile_id) or next((p for p in self._finished if p.id == profile_id), None)
+
+PROFILER = SamplingProfiler()
+
+def _profile_requested(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile":
+            return value.strip().lower() in (b"1", b"true", b"yes")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get("profile", [""])[0].lower() in ("1", "true", "yes")
+
+async def _is_admin_request(scope) -> bool:
+    from fastapi import HTTPException
+    from fastapi.concurrency import run_in_threadpool
+    from app.auth_utils import verify_token
+    from app.services.gemini_resolver import is_admin_email
+
+    authorization = dict(scope.get("headers", [])).get(b"authorization", b"").decode("latin-1")
+    token = authorization.split(" ", 1)[1] if authorization.lower().startswith("bearer ") else None
+    try:
+        payload = await run_in_threadpool(verify_token, token)
+    except HTTPException:
+        return False
+    return is_admin_email(payload.get("email"))
+
+class ProfilingMiddleware:
+    """ASGI middleware, so streamed bodies are profiled until their last chunk is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method, path = scope.get("method", ""), scope.get("path", "")
+        state = {"profile": None}
+        slow_timer = None
+
+        # 1. Requested by an admin: profile from the first byte
+        if _profile_requested(scope) and await _is_admin_request(scope):
+            state["profile"] = PROFILER.start(method, path, "requested")
+        # 2. Otherwise start sampling if the request outlives the threshold
+        elif PROFILE_SLOW_THRESHOLD_SECONDS > 0:
+            def start_slow():
+                state["profile"] = PROFILER.start(method, path, "slow")
+            slow_timer = asyncio.get_running_loop().call_later(PROFILE_SLOW_THRESHOLD_SECONDS, start_slow)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start" and state["profile"] is not None:
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", state["profile"].id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if slow_timer is not None:
+                slow_timer.cancel()
+            if state["profile"] is not None:
+                PROFILER.stop(state["profile"])
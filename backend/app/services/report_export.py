@@ -0,0 +1,104 @@
+import io
+import csv
+import json
+from typing import Iterator, Optional
+from sqlalchemy import select
+from app import models
+from app.db import SessionLocal
+
+# Streams a user's reports straight from a server-side cursor: rows are fetched YIELD_PER at a time
+# and flushed in ~CHUNK_BYTES pieces after the first line, so memory stays flat and the first bytes
+# go out immediately.
+
+YIELD_PER = 200
+CHUNK_BYTES = 64 * 1024
+CSV_COLUMNS = ["id", "company_name", "created_at", "sentiment_score", "report_content"]
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+def _rows(owner_id: int, include_chart: bool) -> Iterator:
+    columns = [
+        models.Report.id,
+        models.Report.company_name,
+        models.Report.created_at,
+        models.ReportContent.sentiment_score,
+        models.ReportContent.report_content,
+    ]
+    if include_chart:
+        columns.append(models.ReportContent.chart_data)
+    query = (
+        select(*columns)
+        .join(models.ReportContent, models.Report.content_id == models.ReportContent.id)
+        .where(models.Report.owner_id == owner_id)
+        .order_by(models.Report.created_at.desc(), models.Report.id.desc())
+        .execution_options(stream_results=True, yield_per=YIELD_PER)
+    )
+    # The request's session is closed before a streamed body finishes, so the export owns one
+    db = SessionLocal()
+    try:
+        for row in db.execute(query):
+            yield row
+    finally:
+        db.close()
+
+def _ndjson_lines(owner_id: int, include_chart: bool) -> Iterator[str]:
+    for row in _rows(owner_id, include_chart):
+        record = dict(row._mapping)
+        record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+        yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+def _csv_lines(owner_id: int, include_chart: bool) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS + (["chart_data"] if include_chart else []))
+    # The header goes out before the query runs
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for row in _rows(owner_id, include_chart):
+        values = list(row)
+        values[2] = values[2].isoformat() if values[2] else ""
+        if include_chart:
+            values[-1] = json.dumps(values[-1]) if values[-1] is not None else ""
+        writer.writerow(values)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _chunked(lines: Iterator[str]) -> Iterator[bytes]:
+    # The first line (CSV header or first record) is flushed alone so the client sees bytes at once
+    first = next(lines, None)
+    if first is None:
+        return
+    yield first.encode("utf-8")
+    pending, size = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= CHUNK_BYTES:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+def _zstd(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    import zstandard
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    for index, chunk in enumerate(chunks):
+        compressed = compressor.compress(chunk)
+        if index == 0:
+            # The compressor would otherwise hold the first chunk back until a block fills
+            compressed += compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_reports(owner_id: int, fmt: str = "ndjson", compress: Optional[str] = None, include_chart: bool = False) -> Iterator[bytes]:
+    lines = _csv_lines(owner_id, include_chart) if fmt == "csv" else _ndjson_lines(owner_id, include_chart)
+    chunks = _chunked(lines)
+    return _zstd(chunks) if compress == "zstd" else chunks
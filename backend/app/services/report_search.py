@@ -0,0 +1,137 @@
+import re
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Full-text index over report_contents (company_name, report_content).
+# SQLite: FTS5 external-content table kept in sync by triggers.
+# Postgres: stored generated tsvector column with a GIN index (maintained by the database itself).
+
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS report_contents_fts USING fts5(
+        company_name, report_content,
+        content='report_contents', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS report_contents_fts_ai AFTER INSERT ON report_contents BEGIN
+        INSERT INTO report_contents_fts(rowid, company_name, report_content)
+        VALUES (new.id, new.company_name, new.report_content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS report_contents_fts_ad AFTER DELETE ON report_contents BEGIN
+        INSERT INTO report_contents_fts(report_contents_fts, rowid, company_name, report_content)
+        VALUES ('delete', old.id, old.company_name, old.report_content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS report_contents_fts_au AFTER UPDATE ON report_contents BEGIN
+        INSERT INTO report_contents_fts(report_contents_fts, rowid, company_name, report_content)
+        VALUES ('delete', old.id, old.company_name, old.report_content);
+        INSERT INTO report_contents_fts(rowid, company_name, report_content)
+        VALUES (new.id, new.company_name, new.report_content);
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """ALTER TABLE report_contents ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(company_name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(report_content, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_report_contents_search ON report_contents USING GIN (search_vector)",
+]
+
+def setup_search_index(engine: Engine):
+    """Creates the dialect's full-text index (idempotent) and backfills it on first creation."""
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'report_contents_fts'")).first()
+            for ddl in _SQLITE_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text("INSERT INTO report_contents_fts(report_contents_fts) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            for ddl in _POSTGRES_DDL:
+                conn.execute(text(ddl))
+        else:
+            print(f"⚠️ Full-text search not supported on {dialect}; /api/reports/search will scan.")
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so user input can never be parsed as FTS5 syntax; prefix-match the last one.
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def search_reports(db: Session, owner_id: int, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+    """Ranked full-text search over one user's reports. Returns (total_matches, page)."""
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        return _search_sqlite(db, owner_id, query, limit, offset)
+    if dialect == "postgresql":
+        return _search_postgres(db, owner_id, query, limit, offset)
+    return _search_scan(db, owner_id, query, limit, offset)
+
+def _search_sqlite(db: Session, owner_id: int, query: str, limit: int, offset: int):
+    match = _fts5_query(query)
+    if not match:
+        return 0, []
+    joins = """
+        FROM report_contents_fts
+        JOIN reports r ON r.content_id = report_contents_fts.rowid
+        WHERE report_contents_fts MATCH :match AND r.owner_id = :owner_id
+    """
+    params = {"match": match, "owner_id": owner_id, "limit": limit, "offset": offset, "start": SNIPPET_START, "end": SNIPPET_END}
+    total = db.execute(text(f"SELECT count(*) {joins}"), params).scalar()
+    rows = db.execute(text(f"""
+        SELECT r.id, r.company_name, r.created_at,
+               snippet(report_contents_fts, 1, :start, :end, '…', 16) AS snippet,
+               -bm25(report_contents_fts, 10.0, 1.0) AS rank
+        {joins}
+        ORDER BY bm25(report_contents_fts, 10.0, 1.0)
+        LIMIT :limit OFFSET :offset
+    """), params).mappings().all()
+    return total, [dict(row) for row in rows]
+
+def _search_postgres(db: Session, owner_id: int, query: str, limit: int, offset: int):
+    params = {"query": query, "owner_id": owner_id, "limit": limit, "offset": offset,
+              "options": f"StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords=30, MinWords=10, MaxFragments=1"}
+    total = db.execute(text("""
+        SELECT count(*)
+        FROM report_contents c JOIN reports r ON r.content_id = c.id
+        WHERE c.search_vector @@ websearch_to_tsquery('english', :query) AND r.owner_id = :owner_id
+    """), params).scalar()
+    # Rank and paginate first, so ts_headline only runs for the rows on this page
+    rows = db.execute(text("""
+        SELECT page.id, page.company_name, page.created_at,
+               ts_headline('english', c.report_content, websearch_to_tsquery('english', :query), :options) AS snippet,
+               page.rank
+        FROM (
+            SELECT r.id, r.company_name, r.created_at, r.content_id,
+                   ts_rank_cd(c.search_vector, websearch_to_tsquery('english', :query)) AS rank
+            FROM report_contents c JOIN reports r ON r.content_id = c.id
+            WHERE c.search_vector @@ websearch_to_tsquery('english', :query) AND r.owner_id = :owner_id
+            ORDER BY rank DESC
+            LIMIT :limit OFFSET :offset
+        ) page
+        JOIN report_contents c ON c.id = page.content_id
+        ORDER BY page.rank DESC
+    """), params).mappings().all()
+    return total, [dict(row) for row in rows]
+
+def _search_scan(db: Session, owner_id: int, query: str, limit: int, offset: int):
+    from app import models
+    pattern = f"%{query}%"
+    base = db.query(models.Report).join(models.ReportContent).filter(
+        models.Report.owner_id == owner_id,
+        (models.ReportContent.report_content.ilike(pattern)) | (models.ReportContent.company_name.ilike(pattern))
+    )
+    total = base.count()
+    page = base.order_by(models.Report.created_at.desc()).offset(offset).limit(limit).all()
+    return total, [
+        {"id": r.id, "company_name": r.company_name, "created_at": r.created_at, "snippet": (r.report_content or "")[:200], "rank": 0.0}
+        for r in page
+    ]
@@ -0,0 +1,110 @@
+import json
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models
+from app.services.dashboard import invalidate_summary
+
+def content_hash(company_name: str, report_content: str, chart_data: Optional[Dict[str, Any]], sentiment_score: Optional[int]) -> str:
+    """sha256 over a canonical JSON encoding of the report payload."""
+    payload = json.dumps(
+        {
+            "company_name": company_name,
+            "report_content": report_content,
+            "chart_data": chart_data,
+            "sentiment_score": sentiment_score,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_content(db: Session, digest: str) -> Optional[models.ReportContent]:
+    return db.query(models.ReportContent).filter(models.ReportContent.content_hash == digest).first()
+
+def get_or_create_content(
+    db: Session,
+    company_name: str,
+    report_content: str,
+    chart_data: Optional[Dict[str, Any]] = None,
+    sentiment_score: Optional[int] = None
+) -> models.ReportContent:
+    """Returns the shared row for this payload, inserting it only if it is new."""
+    digest = content_hash(company_name, report_content, chart_data, sentiment_score)
+    content = get_content(db, digest)
+    if content:
+        return content
+
+    content = models.ReportContent(
+        content_hash=digest,
+        company_name=company_name,
+        report_content=report_content,
+        chart_data=chart_data,
+        sentiment_score=sentiment_score,
+    )
+    try:
+        # Savepoint so a concurrent insert of the same payload only rolls back this row
+        with db.begin_nested():
+            db.add(content)
+    except IntegrityError:
+        content = get_content(db, digest)
+    return content
+
+def link_report(db: Session, owner_id: int, content: models.ReportContent, replace_existing: bool = True) -> models.Report:
+    """
+    Points the user's report for this ticker at `content` (or creates it) and commits.
+    The previously referenced content is dropped if nobody else uses it.
+    """
+    report = None
+    if replace_existing:
+        report = db.query(models.Report).filter(
+            models.Report.company_name == content.company_name,
+            models.Report.owner_id == owner_id
+        ).first()
+
+    old_content_id = None
+    if report:
+        old_content_id = report.content_id
+        report.content = content
+        # Incremented in SQL, so a concurrent relink of the same report is not lost or rejected
+        report.version = models.Report.version + 1
+    else:
+        report = models.Report(company_name=content.company_name, owner_id=owner_id, content=content)
+        db.add(report)
+
+    db.flush()
+    if old_content_id and old_content_id != content.id:
+        prune_contents(db, [old_content_id])
+    db.commit()
+    invalidate_summary(owner_id)
+    db.refresh(report)
+    return report
+
+def prune_contents(db: Session, content_ids: Iterable[Optional[int]]):
+    """Deletes contents that no report references anymore. Caller commits."""
+    ids = {content_id for content_id in content_ids if content_id}
+    if not ids:
+        return
+    still_referenced = db.query(models.Report.content_id).filter(models.Report.content_id.in_(ids))
+    db.query(models.ReportContent).filter(
+        models.ReportContent.id.in_(ids),
+        ~models.ReportContent.id.in_(still_referenced)
+    ).delete(synchronize_session=False)
+
+def delete_report(db: Session, report: models.Report):
+    content_id, owner_id = report.content_id, report.owner_id
+    db.delete(report)
+    db.flush()
+    prune_contents(db, [content_id])
+    db.commit()
+    invalidate_summary(owner_id)
+
+def delete_user_reports(db: Session, owner_id: int):
+    content_ids = [row[0] for row in db.query(models.Report.content_id).filter(models.Report.owner_id == owner_id).distinct()]
+    db.query(models.Report).filter(models.Report.owner_id == owner_id).delete(synchronize_session=False)
+    db.flush()
+    prune_contents(db, content_ids)
+    db.commit()
+    invalidate_summary(owner_id)
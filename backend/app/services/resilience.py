@@ -0,0 +1,208 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.services.metrics import Counter, Histogram
+
+# Resilience for third-party providers (market data, news search):
+# - per-provider timeouts, enforced by running every call on a shared worker pool
+# - circuit breakers that skip a provider after repeated failures until a cool-down probe succeeds
+# - hedged calls that start the fallback once the primary is slow and keep the first good answer
+
+PROVIDER_TIMEOUTS = {"alpaca": 10.0, "yfinance": 15.0, "tavily": 8.0, "duckduckgo": 8.0}
+DEFAULT_TIMEOUT = 10.0
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+
+PROVIDER_CALLS = Counter(
+    "signalforge_provider_calls_total",
+    "Provider calls by outcome (ok, error, timeout, empty, circuit_open).",
+    ("provider", "outcome"),
+)
+PROVIDER_CALL_SECONDS = Histogram(
+    "signalforge_provider_call_seconds",
+    "Latency of completed provider calls.",
+    ("provider",),
+)
+HEDGES = Counter(
+    "signalforge_provider_hedges_total",
+    "Hedged calls by result (primary, fallback_after_error, fallback_after_delay, failed).",
+    ("primary", "result"),
+)
+
+# Abandoned (timed-out) calls keep their thread until the provider returns, so the pool is generous
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="provider")
+
+class ProviderUnavailable(Exception):
+    pass
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures -> half-open probe after `reset_timeout`."""
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # Only one probe at a time while half-open
+            if not self._probing and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._probing:
+                    print(f"⚡ Circuit open for {self.name} after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+def breaker_states() -> Dict[str, str]:
+    return {name: breaker.state for name, breaker in _breakers.items()}
+
+class _Attempt:
+    """One provider call running on the pool. Records its own outcome unless the caller gave up on it."""
+
+    def __init__(self, provider: str, fn: Callable[[], Any], is_good: Callable[[Any], bool]):
+        self.provider = provider
+        self.breaker = get_breaker(provider)
+        self.abandoned = False
+        self._fn = fn
+        self._is_good = is_good
+        self.future = _executor.submit(self._run)
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            result = self._fn()
+        except Exception as e:
+            if not self.abandoned:
+                print(f"⚠️ {self.provider} error: {e}")
+                self.breaker.record_failure()
+                PROVIDER_CALLS.inc(provider=self.provider, outcome="error")
+            raise
+        if not self.abandoned:
+            PROVIDER_CALL_SECONDS.observe(time.perf_counter() - start, provider=self.provider)
+            # An empty answer is not a provider fault, so it doesn't trip the breaker
+            self.breaker.record_success()
+            PROVIDER_CALLS.inc(provider=self.provider, outcome="ok" if self._is_good(result) else "empty")
+        return result
+
+    def good_result(self) -> Tuple[bool, Any]:
+        if self.future.exception() is not None:
+            return False, None
+        result = self.future.result()
+        return self._is_good(result), result
+
+    def abandon(self):
+        self.abandoned = True
+        self.breaker.record_failure()
+        PROVIDER_CALLS.inc(provider=self.provider, outcome="timeout")
+
+def _start(provider: str, fn: Callable[[], Any], is_good: Callable[[Any], bool]) -> Optional[_Attempt]:
+    if not get_breaker(provider).allow():
+        PROVIDER_CALLS.inc(provider=provider, outcome="circuit_open")
+        return None
+    return _Attempt(provider, fn, is_good)
+
+def call_provider(provider: str, fn: Callable[[], Any], timeout: Optional[float] = None, is_good: Callable[[Any], bool] = bool):
+    """Runs `fn` with the provider's timeout and circuit breaker. Raises ProviderUnavailable."""
+    timeout = timeout or PROVIDER_TIMEOUTS.get(provider, DEFAULT_TIMEOUT)
+    attempt = _start(provider, fn, is_good)
+    if attempt is None:
+        raise ProviderUnavailable(f"{provider} circuit is open")
+
+    done, _ = wait([attempt.future], timeout=timeout)
+    if not done:
+        attempt.abandon()
+        raise ProviderUnavailable(f"{provider} timed out after {timeout}s")
+    if attempt.future.exception() is not None:
+        raise ProviderUnavailable(f"{provider} failed: {attempt.future.exception()}")
+    return attempt.future.result()
+
+def hedged(
+    primary: Tuple[str, Callable[[], Any]],
+    fallback: Tuple[str, Callable[[], Any]],
+    hedge_after: float,
+    timeout: Optional[float] = None,
+    is_good: Callable[[Any], bool] = bool,
+):
+    """
+    Starts the primary; if it fails, is skipped by its breaker, or has not answered after
+    `hedge_after` seconds, starts the fallback too and returns the first good result.
+    Gives up after `timeout` seconds in total (default: the slower provider's timeout).
+    """
+    primary_name, fallback_name = primary[0], fallback[0]
+    if timeout is None:
+        timeout = max(PROVIDER_TIMEOUTS.get(name, DEFAULT_TIMEOUT) for name in (primary_name, fallback_name))
+    deadline = time.monotonic() + timeout
+
+    pending = {}
+    reason = "fallback_after_error"
+    first = _start(primary_name, primary[1], is_good)
+    if first is not None:
+        done, _ = wait([first.future], timeout=hedge_after)
+        if done:
+            ok, result = first.good_result()
+            if ok:
+                HEDGES.inc(primary=primary_name, result="primary")
+                return result
+        else:
+            reason = "fallback_after_delay"
+            pending[first.future] = first
+
+    second = _start(fallback_name, fallback[1], is_good)
+    if second is not None:
+        pending[second.future] = second
+
+    # Race whatever is still running; the first good answer wins
+    while pending:
+        done, _ = wait(list(pending), timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            attempt = pending.pop(future)
+            ok, result = attempt.good_result()
+            if ok:
+                won = "primary" if attempt is first else reason
+                # A still-running loser is left to finish and record its own outcome
+                HEDGES.inc(primary=primary_name, result=won)
+                return result
+
+    for attempt in pending.values():
+        attempt.abandon()
+    HEDGES.inc(primary=primary_name, result="failed")
+    raise ProviderUnavailable(f"{primary_name} and {fallback_name} both failed")
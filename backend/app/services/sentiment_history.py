@@ -0,0 +1,80 @@
+import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import models
+
+def _upsert_rollup(db: Session, ticker: str, day: datetime.date, score: int):
+    """count/sum/min/max for (ticker, day) updated in one statement, so concurrent writers can't lose updates."""
+    table = models.SentimentDailyRollup.__table__
+    dialect = db.bind.dialect.name
+    values = {
+        "ticker": ticker, "day": day, "count": 1, "score_sum": score,
+        "score_min": score, "score_max": score, "updated_at": datetime.datetime.utcnow(),
+    }
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+            least, greatest = func.least, func.greatest
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+            # SQLite's two-argument min()/max() are scalar functions
+            least, greatest = func.min, func.max
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.ticker, table.c.day],
+            set_={
+                "count": table.c.count + 1,
+                "score_sum": table.c.score_sum + score,
+                "score_min": least(table.c.score_min, stmt.excluded.score_min),
+                "score_max": greatest(table.c.score_max, stmt.excluded.score_max),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    rollup = db.get(models.SentimentDailyRollup, (ticker, day))
+    if rollup is None:
+        db.add(models.SentimentDailyRollup(**values))
+    else:
+        rollup.count += 1
+        rollup.score_sum += score
+        rollup.score_min = min(rollup.score_min, score)
+        rollup.score_max = max(rollup.score_max, score)
+
+def record_sentiment(
+    db: Session,
+    ticker: str,
+    score: Optional[int],
+    content_hash: Optional[str] = None,
+    observed_at: Optional[datetime.datetime] = None
+):
+    """Appends an observation and folds it into the daily rollup. Caller commits."""
+    if score is None:
+        return
+    observed_at = observed_at or datetime.datetime.utcnow()
+    ticker = ticker.upper()
+    db.add(models.SentimentObservation(ticker=ticker, score=score, observed_at=observed_at, content_hash=content_hash))
+    _upsert_rollup(db, ticker, observed_at.date(), score)
+
+def get_sentiment_series(db: Session, ticker: str, days: int = 90) -> Dict[str, Any]:
+    """Daily sentiment for the last `days` days, read from the rollups only."""
+    ticker = ticker.upper()
+    since = datetime.datetime.utcnow().date() - datetime.timedelta(days=days - 1)
+    rollups = db.query(models.SentimentDailyRollup).filter(
+        models.SentimentDailyRollup.ticker == ticker,
+        models.SentimentDailyRollup.day >= since
+    ).order_by(models.SentimentDailyRollup.day).all()
+
+    series = [
+        {"date": r.day.isoformat(), "mean": r.mean, "min": r.score_min, "max": r.score_max, "count": r.count}
+        for r in rollups
+    ]
+    return {
+        "ticker": ticker,
+        "days": days,
+        "observations": sum(point["count"] for point in series),
+        "history": series,
+    }
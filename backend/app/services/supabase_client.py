@@ -1,17 +1,20 @@
 import os
-from supabase import create_client, Client
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-_supabase: Client = None
+_supabase: "Client" = None
 
-def get_supabase() -> Client:
+def get_supabase() -> "Client":
     global _supabase
     if _supabase is None:
         if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
             raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be configured for BYOK.")
+        from supabase import create_client
         _supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
     return _supabase
 
@@ -0,0 +1,74 @@
+"""
+Import-time report for the API process:
+
+    python -m app.startup_report [--top 25] [--strict]
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter, prints the
+slowest modules by cumulative import time and lists any heavy dependency that was
+loaded eagerly. With --strict the exit code is 1 when one of them is found, so CI
+can catch regressions in cold-start time.
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Packages that must only be imported on first use, never while serving starts up.
+DEFERRED_PACKAGES = (
+    "langchain", "langchain_core", "langchain_community", "langchain_google_genai",
+    "langgraph", "google.genai", "yfinance", "pandas", "tavily", "duckduckgo_search",
+    "ddgs", "supabase",
+)
+
+def collect_import_times(target: str = "app.main"):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.split(":", 1)[1].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+        except ValueError:
+            continue  # header line
+    return proc.returncode, rows
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--strict", action="store_true", help="fail if a deferred package was imported")
+    args = parser.parse_args(argv)
+
+    returncode, rows = collect_import_times(args.target)
+    if returncode != 0 or not rows:
+        print(f"❌ Importing {args.target} failed (exit code {returncode})")
+        return 1
+
+    total = next((cumulative for name, _, cumulative in rows if name == args.target), 0)
+    print(f"⏱️  import {args.target}: {total / 1000:.1f} ms ({len(rows)} modules)\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    eager = sorted({
+        pkg for pkg in DEFERRED_PACKAGES for name, _, _ in rows
+        if name == pkg or name.startswith(pkg + ".")
+    })
+    if eager:
+        print(f"\n⚠️ Loaded eagerly at startup: {', '.join(eager)}")
+        return 1 if args.strict else 0
+    print("\n✅ No deferred dependencies imported at startup")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+# Inputs for the microbenchmarks. Agent answers are recorded in fixtures/agent_responses.json;
+# market data is generated from a fixed seed in the providers' own response shapes, so every
+# run (and the stored baseline) sees byte-identical input without network access.
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+SEED = 20240101
+# Trading days in five years
+BARS_5Y = 1260
+
+def agent_responses() -> Dict[str, object]:
+    with open(FIXTURES_DIR / "agent_responses.json", encoding="utf-8") as f:
+        return json.load(f)
+
+def _trading_days(count: int, end: date = date(2024, 12, 31)) -> List[date]:
+    days, current = [], end
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current)
+        current -= timedelta(days=1)
+    return days[::-1]
+
+def price_path(count: int = BARS_5Y, start: float = 150.0) -> List[float]:
+    rng = random.Random(SEED)
+    prices, price = [], start
+    for _ in range(count):
+        price *= 1 + rng.gauss(0.0004, 0.018)
+        prices.append(round(price, 4))
+    return prices
+
+def chart_data(count: int = BARS_5Y, symbol: str = "AAPL", currency: str = "USD") -> dict:
+    """A stored chart as get_stock_history returns it."""
+    return {
+        "symbol": symbol,
+        "currency": currency,
+        "history": [
+            {"date": day.isoformat(), "price": round(price, 2)}
+            for day, price in zip(_trading_days(count), price_path(count))
+        ],
+    }
+
+def alpaca_bars_pages(symbols: List[str], count: int = BARS_5Y, page_size: int = 10000) -> List[dict]:
+    """/v2/stocks/bars responses for `symbols`, split into pages the way Alpaca paginates them."""
+    bars = []
+    for offset, symbol in enumerate(symbols):
+        for day, close in zip(_trading_days(count), price_path(count, start=100.0 + offset * 25)):
+            bars.append((symbol, {
+                "t": f"{day.isoformat()}T05:00:00Z",
+                "o": round(close * 0.995, 2), "h": round(close * 1.01, 2), "l": round(close * 0.99, 2),
+                "c": close, "v": 1_000_000 + offset, "n": 9000, "vw": round(close, 3),
+            }))
+
+    pages = []
+    for i in range(0, len(bars), page_size):
+        page = {}
+        for symbol, bar in bars[i:i + page_size]:
+            page.setdefault(symbol, []).append(bar)
+        pages.append({"bars": page, "next_page_token": f"page-{len(pages) + 1}" if i + page_size < len(bars) else None})
+    return pages
+
+def yfinance_frame(symbols: List[str], count: int = BARS_5Y):
+    """A yf.download(...) result: (Price, Ticker) column MultiIndex over a DatetimeIndex."""
+    import pandas as pd
+
+    index = pd.DatetimeIndex([pd.Timestamp(day) for day in _trading_days(count)], name="Date")
+    columns = {}
+    for offset, symbol in enumerate(symbols):
+        closes = price_path(count, start=100.0 + offset * 25)
+        columns[("Close", symbol)] = closes
+        columns[("Open", symbol)] = [p * 0.995 for p in closes]
+        columns[("Volume", symbol)] = [1_000_000] * count
+    frame = pd.DataFrame(columns, index=index)
+    frame.columns = pd.MultiIndex.from_tuples(frame.columns, names=["Price", "Ticker"])
+    return frame.sort_index(axis=1)
+
+def report_payload() -> dict:
+    """A cached /api/analyze response: memo text plus a 3M chart."""
+    responses = agent_responses()
+    return {
+        "id": 1,
+        "company_name": "AAPL",
+        "report_content": json.loads(responses["structured"])["markdown"],
+        "chart_data": chart_data(63),
+        "sentiment_score": 72,
+        "content_hash": "0" * 64,
+    }
@@ -0,0 +1,138 @@
+"""
+Microbenchmarks for the CPU-bound hot paths, gated against a stored baseline.
+
+    python -m benchmarks.run                 # compare with baseline.json, exit 1 on regression
+    python -m benchmarks.run --save          # record a new baseline
+    python -m benchmarks.run -k parse_report # only matching cases
+
+Run from backend/. Baselines are machine-specific: record one on the machine that gates.
+The gate compares each case's fastest repeat, and re-measures a flagged case before failing.
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import time
+import timeit
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+
+# The app modules read these at import; the benchmarks never touch a database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+REPEATS = 15
+# Slower than baseline by more than this fraction counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# Cases over the tolerance are measured again this many times, a pause apart (so a burst of
+# other load on the machine can pass), before the gate fails
+RECHECKS = 3
+RECHECK_PAUSE_SECONDS = 2.0
+
+def measure(fn, repeats: int = REPEATS) -> dict:
+    """Per-call seconds: each repeat runs enough calls to last ~0.2s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    samples = [t / number for t in timer.repeat(repeat=repeats, number=number)]
+    return {"median": statistics.median(samples), "min": min(samples), "number": number}
+
+def run_cases(pattern: str = None, names: list = None) -> dict:
+    from benchmarks.suite import CASES
+
+    results = {}
+    for name, setup in CASES.items():
+        if pattern and pattern not in name:
+            continue
+        if names is not None and name not in names:
+            continue
+        with ExitStack() as stack:
+            # Modules print status lines (cache misses, provider notes); keep the report readable
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                fn = setup(stack)
+                fn()
+                results[name] = measure(fn)
+    return results
+
+def _format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:9.2f} ms"
+    return f"{seconds * 1e6:9.2f} µs"
+
+def _change(result: dict, base: dict) -> float:
+    # The fastest repeat is the least disturbed by other load on the machine, so the gate uses min
+    return result["min"] / base["min"] - 1
+
+def recheck(results: dict, baseline: dict, tolerance: float) -> dict:
+    """Measures cases over the tolerance again, keeping each one's best run, so noise does not fail the gate."""
+    for _ in range(RECHECKS):
+        flagged = [name for name, result in results.items() if name in baseline and _change(result, baseline[name]) > tolerance]
+        if not flagged:
+            break
+        time.sleep(RECHECK_PAUSE_SECONDS)
+        for name, result in run_cases(names=flagged).items():
+            if result["min"] < results[name]["min"]:
+                results[name] = result
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints the comparison table; returns True when nothing regressed."""
+    ok = True
+    print(f"{'benchmark':<40} {'min':>12} {'baseline':>12} {'change':>8}  status")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<40} {_format_time(result['min']):>12} {'—':>12} {'':>8}  new")
+            continue
+        change = _change(result, base)
+        status = "ok"
+        if change > tolerance:
+            status, ok = "REGRESSION", False
+        elif change < -tolerance:
+            status = "faster"
+        print(f"{name:<40} {_format_time(result['min']):>12} {_format_time(base['min']):>12} {change:>+7.1%}  {status}")
+    return ok
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.pattern)
+
+    if args.save:
+        stored = {"meta": {}, "results": {}}
+        if args.baseline.exists() and args.pattern:
+            # A filtered run only replaces its own cases
+            stored = json.loads(args.baseline.read_text())
+        stored["meta"] = {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+        stored["results"].update({
+            name: {"median": round(r["median"], 9), "min": round(r["min"], 9)} for name, r in results.items()
+        })
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        for name, result in results.items():
+            print(f"{name:<40} {_format_time(result['min']):>12}")
+        print(f"✅ Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"⚠️ No baseline at {args.baseline}; run with --save first")
+        compare(results, {}, args.tolerance)
+        return 0
+
+    stored = json.loads(args.baseline.read_text())
+    baseline = stored.get("results", {})
+    results = recheck(results, baseline, args.tolerance)
+    ok = compare(results, baseline, args.tolerance)
+    meta = stored.get("meta", {})
+    if meta.get("python") != platform.python_version():
+        print(f"ℹ️ Baseline was recorded on Python {meta.get('python')}, this is {platform.python_version()}")
+    print("✅ No regressions" if ok else f"❌ Regressions beyond {args.tolerance:.0%}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import os
+import time
+from contextlib import ExitStack
+from typing import Callable, Dict
+from unittest import mock
+from benchmarks import fixtures
+
+# Each case prepares its input (and any patches, on `stack`) outside the timed region and
+# returns the zero-argument callable that is timed. Provider calls are patched to replay the
+# fixtures, so only the parsing/transform code is measured.
+
+CASES: Dict[str, Callable[[ExitStack], Callable[[], object]]] = {}
+
+def case(name: str):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+class _DictRedis:
+    """In-process stand-in for the Redis client, so cache cases time (de)serialization only."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+def _use_cache(stack: ExitStack) -> _DictRedis:
+    from app.services import cache
+    client = _DictRedis()
+    stack.enter_context(mock.patch.object(cache, "_client", client))
+    return client
+
+# --- Agent output parsing ---
+
+@case("parse_agent_response.content_blocks")
+def _parse_agent_response(stack):
+    from app.api.endpoints import parse_agent_response
+    blocks = fixtures.agent_responses()["content_blocks"]
+    return lambda: parse_agent_response(blocks)
+
+@case("parse_report.structured")
+def _parse_structured(stack):
+    from app.agent.report_parser import parse_report
+    text = fixtures.agent_responses()["structured"]
+    return lambda: parse_report(text)
+
+@case("parse_report.fenced")
+def _parse_fenced(stack):
+    from app.agent.report_parser import parse_report
+    text = fixtures.agent_responses()["fenced"]
+    return lambda: parse_report(text)
+
+@case("parse_report.malformed")
+def _parse_malformed(stack):
+    from app.agent.report_parser import parse_report
+    text = fixtures.agent_responses()["malformed"]
+    return lambda: parse_report(text)
+
+# --- Market data ---
+
+@case("convert_chart_data.5y")
+def _convert_chart(stack):
+    from app.services.finance import convert_chart_data
+    client = _use_cache(stack)
+    client.setex("forex:USD:INR", 86400, "83.25")
+    chart = fixtures.chart_data()
+    return lambda: convert_chart_data(chart, "INR")
+
+@case("alpaca_bars.parse_5y_2symbols")
+def _alpaca_bars(stack):
+    import requests
+    from app.services.market_data import fetch_alpaca_bars
+    stack.enter_context(mock.patch.dict(os.environ, {"ALPACA_API_KEY": "bench", "ALPACA_SECRET_KEY": "bench"}))
+    # Two symbols of 5Y bars split into 2000-bar pages, so the pagination loop is exercised
+    pages = fixtures.alpaca_bars_pages(["AAPL", "MSFT"], page_size=2000)
+    calls = {"n": 0}
+
+    def fake_get(url, headers=None, params=None, timeout=None):
+        page = pages[calls["n"] % len(pages)]
+        calls["n"] += 1
+        return _Response(page)
+
+    stack.enter_context(mock.patch.object(requests, "get", fake_get))
+    return lambda: fetch_alpaca_bars(["AAPL", "MSFT"], "5Y")
+
+@case("yfinance_closes.transform_5y_3symbols")
+def _yfinance_closes(stack):
+    import yfinance
+    from app.services.market_data import fetch_yfinance_closes
+    frame = fixtures.yfinance_frame(["RELIANCE.NS", "TCS.NS", "INFY.NS"])
+    stack.enter_context(mock.patch.object(yfinance, "download", lambda *a, **k: frame))
+    return lambda: fetch_yfinance_closes(["RELIANCE.NS", "TCS.NS", "INFY.NS"], "5Y")
+
+@case("indicators.compute_5y")
+def _indicators(stack):
+    from app.services.indicators import compute_indicators
+    prices = [point["price"] for point in fixtures.chart_data()["history"]]
+    return lambda: compute_indicators(prices)
+
+@case("downsample.lttb_5y_to_200")
+def _downsample(stack):
+    from app.services.downsample import downsample_chart
+    chart = fixtures.chart_data()
+    return lambda: downsample_chart(chart, 200)
+
+# --- Cache ---
+
+@case("cache.report_roundtrip")
+def _cache_roundtrip(stack):
+    from app.services.cache import CacheService
+    _use_cache(stack)
+    payload = fixtures.report_payload()
+
+    def roundtrip():
+        CacheService.set("report:bench:USD", payload)
+        return CacheService.get("report:bench:USD")
+    return roundtrip
+
+# --- Auth ---
+
+@case("auth.verify_token_hs256")
+def _verify_token(stack):
+    import jwt
+    from app import auth_utils
+    secret = "bench-secret-" + "x" * 32
+    stack.enter_context(mock.patch.object(auth_utils, "SECRET_KEY", secret))
+    token = jwt.encode({
+        "sub": "00000000-0000-0000-0000-000000000000",
+        "email": "bench@example.com",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        "user_metadata": {"global_currency": "USD"},
+    }, secret, algorithm="HS256")
+    return lambda: auth_utils.verify_token(token)
@@ -54,7 +54,8 @@ export default function DashboardPage() {
         const token = await getToken();
         if (!token) return;
 
-        const res = await fetch(`${API_URL}/api/reports`, {
+        // Dashboard cards only need a sparkline-sized series
+        const res = await fetch(`${API_URL}/api/reports?max_points=120`, {
           headers: { Authorization: `Bearer ${token}` },
         });
 
@@ -147,7 +147,7 @@ export default function ReportClient() {
       if (!token) return;
 
       const res = await fetch(
-        `${API_URL}/api/reports/${reportId}/chart?timeframe=${tf}`,
+        `${API_URL}/api/reports/${reportId}/chart?timeframe=${tf}&max_points=400`,
         {
           headers: { Authorization: `Bearer ${token}` },
         },